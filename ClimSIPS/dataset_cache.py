@@ -0,0 +1,66 @@
+#################################
+# packages
+#################################
+
+import xarray as xr
+
+import os
+import threading
+from collections import OrderedDict
+
+##################################################################
+# process-wide cache of decoded datasets
+##################################################################
+
+# number of datasets kept, the least recently used ones are dropped beyond it
+DATASET_CACHE_SIZE = 32
+
+dataset_cache = OrderedDict()
+# files are also opened from threads (see function.load_concurrently)
+dataset_cache_lock = threading.Lock()
+
+# key of a file: its path, modification time and size, and the options it is opened with
+def dataset_key(path, kwargs):
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size, repr(sorted(kwargs.items())))
+
+# use_cftime is passed through the time decoder where xarray has one (use_cftime as a keyword is deprecated there)
+def decode_kwargs(kwargs):
+    coders = getattr(xr, 'coders', None)
+    if 'use_cftime' not in kwargs or coders is None or 'decode_times' in kwargs:
+        return kwargs
+    kwargs = dict(kwargs)
+    kwargs['decode_times'] = coders.CFDatetimeCoder(use_cftime=kwargs.pop('use_cftime'))
+    return kwargs
+
+# xr.open_dataset through the cache, each unchanged file is decoded once per process.
+# without chunks the data are loaded and the file closed, with chunks the dask-backed dataset is kept.
+# a shallow copy is returned, so that assigning variables or coordinates does not change the cached dataset.
+# dropped datasets are not closed: copies of a chunked one still read from its file, which is closed once unused
+def open_dataset(path, **kwargs):
+    path = os.path.abspath(path)
+    key = dataset_key(path, kwargs)
+    with dataset_cache_lock:
+        if key in dataset_cache:
+            dataset_cache.move_to_end(key)
+            return dataset_cache[key].copy(deep=False)
+
+    ds = xr.open_dataset(path, **decode_kwargs(kwargs))
+    if kwargs.get('chunks') is None:
+        ds.load()
+        ds.close()
+
+    with dataset_cache_lock:
+        # older versions of a changed file are not used again
+        for stale in [k for k in dataset_cache if k[0] == path and k[1:3] != key[1:3]]:
+            dataset_cache.pop(stale)
+        dataset_cache[key] = ds
+        dataset_cache.move_to_end(key)
+        while len(dataset_cache) > DATASET_CACHE_SIZE:
+            dataset_cache.popitem(last=False)
+    return ds.copy(deep=False)
+
+# drops all cached datasets
+def clear_dataset_cache():
+    with dataset_cache_lock:
+        dataset_cache.clear()
@@ -12,15 +12,38 @@ from statsmodels.stats.weightstats import DescrStatsW
 import xskillscore
 
 import itertools
+import heapq
+import hashlib
+import warnings
 import math
 import time
 import random
 import sys
 import csv
+import io
+import os
+import json
+import sqlite3
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import numba # optional, compiled solver
+except ImportError:
+    numba = None
+
+try:
+    from multiprocessing import shared_memory # python >= 3.8
+except ImportError:
+    shared_memory = None
+
+try:
+    import dask # optional, lazy chunked loading of the predictors
+except ImportError:
+    dask = None
 
 from . import member_selection as csms
+from . import dataset_cache as csdc
 
 ##################################################################
 # functions for output file creations
@@ -40,18 +63,38 @@ def select_default_common_models(ds,CMIP):
     return ds.sel(member=members)
 
 # load performance predictors
-def load_models(path,filename,CMIP,default_models=True):
-    res = xr.open_dataset(path+filename,use_cftime = True)
+# with chunks (e.g. {} for the chunks of the file), the data are dask arrays read when they are computed
+def load_models(path,filename,CMIP,default_models=True,chunks=None):
+    res = csdc.open_dataset(path+filename,use_cftime = True,chunks=dask_chunks(chunks))
     res = res.sortby(res.member)
     if default_models:
         res = select_default_common_models(res,CMIP)
     return res
 
 # load observations
-def load_observations(path,filename):
-    res = xr.open_dataset(path+filename,use_cftime = True)
+def load_observations(path,filename,chunks=None):
+    res = csdc.open_dataset(path+filename,use_cftime = True,chunks=dask_chunks(chunks))
     return res
 
+# chunks are only used if dask is installed, otherwise the files are loaded eagerly
+def dask_chunks(chunks):
+    return chunks if dask is not None else None
+
+# loads files in a thread pool, as {filename: load(filename)}.
+# on parallel file systems the latency per file dominates, which the threads overlap
+def load_concurrently(load, filenames, io_workers=1):
+    filenames = list(dict.fromkeys(filenames))
+    if io_workers == 1:
+        return {filename: load(filename) for filename in filenames}
+    with ThreadPoolExecutor(max_workers=io_workers) as pool:
+        return dict(zip(filenames, pool.map(load, filenames)))
+
+# computes lazy (dask-backed) results of a dict together, so that shared reads and reductions run in parallel
+def compute_together(results):
+    if dask is None:
+        return results
+    return dict(zip(results, dask.compute(*results.values())))
+
 # cosine-latitude weighted average
 def cos_lat_weighted_mean(ds):
   weights = np.cos(np.deg2rad(ds.lat))
@@ -256,34 +299,64 @@ def ensemble_mean_or_individual_member(ds,choice,CMIP,season_region,key=None):
 def normalize_spread_component(ds):
     return (ds  - np.mean(ds))/np.std(ds)
 
-# compute squared difference for spread metric
-def get_squared_diff(ds):
-    mod_coords = ds.member.values
+# compute squared difference for spread metric, summed over any number of target variables (one value per member each).
+# as for the sum of the single-variable matrices, pairs without a difference in any variable (the diagonal) are nan
+def get_squared_diff(*ds_list):
+    ds_list = xr.align(*ds_list)
+    mod_coords = ds_list[0].member.values
     nmod = len(mod_coords)
-    res = xr.DataArray(np.empty(shape=(nmod, nmod)),
-                        dims=("member", "member_model"), coords=dict(member=mod_coords, member_model=mod_coords))
+    res = np.zeros((nmod, nmod))
+    same = np.zeros((nmod, nmod), dtype=bool)
+    squared = np.empty((nmod, nmod))
+    for ds in ds_list:
+        values = np.asarray(ds.transpose("member").values, dtype=np.float64)
+        np.subtract.outer(values, values, out=squared)
+        np.square(squared, out=squared)
+        res += squared
+        same |= squared == 0
+    res[same] = np.nan
+    return xr.DataArray(res, dims=("member", "member_model"), coords=dict(member=mod_coords, member_model=mod_coords))
 
-    for mod1 in ds.transpose("member", ...):
-        for mod2 in ds.transpose("member", ...):
-            a = (mod1-mod2)**2
-            res.loc[dict(member=mod1.member, member_model=mod2.member)] = a
-    return res.where(res!=0)
+# squared errors below this fraction of |x_i|^2 + |x_j|^2 are rounding of the cancellation and set to 0
+GRAM_TOLERANCE = 1e-10
 
 # compute independence matrix
+# all cos-lat weighted rmses (as xskillscore.rmse with skipna) at once: with x the weighted fields (nan set to 0)
+# and v the masks of valid cells, the squared error over the cells valid in both members i and j is
+# |x_i|^2 (on v_j) + |x_j|^2 (on v_i) - 2 x_i.x_j, i.e. the symmetric product x x^T. it is evaluated
+# for the upper triangle only and mirrored; identical members have an error of 0 and are nan, as the diagonal
 def get_error(ds):
-    weights = [np.cos(np.deg2rad(ds.lat))]*len(ds.lon)
-    weights = xr.concat(weights, "lon")
-    weights['lon'] = ds.lon
+    ds = ds.transpose("member", "lat", "lon")
     mod_coords = ds.member.values
     nmod = len(mod_coords)
-    res = xr.DataArray(np.empty(shape=(nmod, nmod)),
-                        dims=("member", "member_model"), coords=dict(member=mod_coords, member_model=mod_coords))
-
-    for mod1 in ds.transpose("member", ...):
-        for mod2 in ds.transpose("member", ...):
-            a = xskillscore.rmse(mod1,mod2,dim=['lat','lon'],weights=weights,skipna=True)
-            res.loc[dict(member=mod1.member, member_model=mod2.member)] = a
-
+    weights = np.broadcast_to(np.cos(np.deg2rad(ds.lat.values))[:, None], ds.shape[1:]).reshape(-1)
+    data = np.asarray(ds.values, dtype=np.float64).reshape(nmod, -1)
+    valid = ~np.isnan(data)
+    # the differences do not change when the multi-model mean of each cell is removed, but the cancellation does
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning) # cells that are nan in all members
+        data = data - np.nanmean(data, axis=0)
+    root = np.sqrt(weights)
+    x = np.where(valid, data, 0.) * root
+    v = valid * root
+    i, j = np.triu_indices(nmod, 1)
+    gram = (x @ x.T)[i, j]
+    if (valid == valid[:1]).all():
+        # all members share one mask, the norms and the weight sum do not depend on the pair
+        squares = (x*x).sum(axis=1)
+        square_i, square_j = squares[i], squares[j]
+        weight_sum = v[0] @ v[0]
+    else:
+        squares = (x*x) @ valid.T.astype(np.float64)
+        square_i, square_j = squares[i, j], squares[j, i]
+        weight_sum = (v @ v.T)[i, j]
+    squared_error = square_i + square_j - 2 * gram
+    squared_error[squared_error <= GRAM_TOLERANCE * (square_i + square_j)] = 0.
+    res = np.zeros((nmod, nmod))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res[i, j] = np.sqrt(squared_error / weight_sum)
+    res[j, i] = res[i, j]
+    res = xr.DataArray(res, dims=("member", "member_model"), coords=dict(member=mod_coords, member_model=mod_coords))
     return res.where(res!=0)
 
 # normalize for independence
@@ -294,93 +367,309 @@ def normalize_independence_matrix(ds):
 # functions for model ensemble subselection
 ##################################################################
 
-# create csv with minimizing value and subset listed for each alpha-beta combo (one core)
-def multi_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=False):
+# all (alpha, beta) pairs of the ternary grid, in the order they are written to csv
+def alpha_beta_grid(alpha_steps, beta_steps):
+    grid = []
+    for alpha_idx in range(0,alpha_steps+1):
+        for beta_idx in range(0,beta_steps+1):
+            alpha = alpha_idx/alpha_steps
+            beta = beta_idx/beta_steps
+            if alpha + beta > 1:
+                continue
+            grid.append((alpha, beta))
+    return grid
+
+# grid cells in serpentine order (beta ascending for every other alpha, descending in between),
+# so that consecutive cells are neighbours
+def serpentine_order(grid):
+    rows = {}
+    for alpha, beta in grid:
+        rows.setdefault(alpha, []).append((alpha, beta))
+    order = []
+    for i, alpha in enumerate(sorted(rows)):
+        order += rows[alpha] if i % 2 == 0 else rows[alpha][::-1]
+    return order
+
+# name of the csv holding the alpha-beta scan
+def scan_filename(cmip, im_or_em, season_region, min2=False, top_k=None):
     min2_text=""
     if min2:
         min2_text='min2_'
-    filename=Path(cmip+'_'+im_or_em+'_'+season_region+'_'+min2_text+'alpha-beta-scan.csv')
+    if top_k:
+        min2_text=f'top{top_k}_'
+    return Path(cmip+'_'+im_or_em+'_'+season_region+'_'+min2_text+'alpha-beta-scan.csv')
+
+# csv header of the alpha-beta scan, with a rank column when the k best subsets are written
+def scan_header(m, top_k=None):
+    rank = ['rank'] if top_k else []
+    return ['alpha','beta']+rank+['min_val']+[f'member{i}' for i in range(m)]
+
+# csv rows of one alpha-beta pair (one per subset for top_k)
+def scan_rows(alpha, beta, min_val, min_member, top_k=None):
+    if not top_k:
+        return [[alpha,beta,min_val]+min_member]
+    return [[alpha,beta,rank,val]+list(subset) for rank, (val, subset) in enumerate(zip(min_val, min_member))]
+
+# adds counts to a dict of solver statistics (e.g. the nodes visited by branch_and_bound), nothing if stats is None
+def add_stats(stats, **counts):
+    if stats is None:
+        return
+    for key, count in counts.items():
+        stats[key] = stats.get(key, 0) + count
+
+# name of the csv with the solver statistics of each alpha-beta pair, next to the scan csv
+def stats_filename(filename):
+    return Path(str(filename)[:-len('.csv')]+'_stats.csv')
+
+# writes the solver statistics {(alpha, beta): stats} of the alpha-beta pairs solved in this run, if any were collected
+# (pairs resumed from a partial scan or returned from the result cache have none)
+def write_scan_stats(filename, cell_stats):
+    cell_stats = {cell: stats for cell, stats in cell_stats.items() if stats}
+    if len(cell_stats) == 0:
+        return None
+    keys = sorted(set(key for stats in cell_stats.values() for key in stats))
+    stats_file = stats_filename(filename)
+    with open(stats_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['alpha','beta']+keys)
+        for (alpha, beta), stats in sorted(cell_stats.items()):
+            writer.writerow([alpha, beta]+[stats.get(key, '') for key in keys])
+    return stats_file
+
+# one line on the dominance pre-filter over all alpha-beta pairs of a scan (nothing if it was not used)
+def report_prefilter(cell_stats):
+    kept = [stats['prefilter_kept'] for stats in cell_stats.values() if 'prefilter_kept' in stats]
+    if len(kept) == 0:
+        return
+    members = max(stats['prefilter_members'] for stats in cell_stats.values() if 'prefilter_members' in stats)
+    print(f"dominance pre-filter: {members} -> {min(kept)} to {max(kept)} members (mean {np.mean(kept):.1f}) "
+          f"in {len(kept)} alpha-beta pairs")
+
+# create csv with minimizing value and subset listed for each alpha-beta combo (one core)
+def multi_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=False, solver='numpy', top_k=None, shard_workers=1, prefilter=False, cache=None):
+    filename=scan_filename(cmip, im_or_em, season_region, min2, top_k)
     if filename.exists():
         raise RuntimeError('file exists!')
-    with open(filename, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['alpha','beta','min_val']+[f'member{i}' for i in range(m)])
-        for alpha_idx in range(0,alpha_steps+1):
-            for beta_idx in range(0,beta_steps+1):
-                alpha = alpha_idx/alpha_steps
-                beta = beta_idx/beta_steps
-                if alpha + beta > 1:
-                    continue
-                min_val, min_member = single_run(m, alpha, beta, perf_cutoff, data, silent=True, min2=min2)
+    # finished cells are appended to a partial file, a restarted run continues after them;
+    # the cell being solved saves checkpoints (numpy solver)
+    partial = Path(str(filename)+'.partial')
+    checkpoint = Path(str(filename)+'.checkpoint') if solver == 'numpy' and shard_workers == 1 else None
+    settings = scan_header(m, top_k) + [f'perf_cutoff={perf_cutoff}', f'data={metrics_digest(*get_metrics(data))}']
+    results = read_partial_scan(partial, settings, top_k)
+    if len(results) > 0:
+        print(f'resuming {partial} with {len(results)} finished alpha-beta pairs')
+
+    # neighbouring cells mostly share their optimum, which warm starts the next cell
+    grid = alpha_beta_grid(alpha_steps, beta_steps)
+    incumbents = []
+    cell_stats = {}
+    with open(partial, 'a', newline='') as f:
+        if f.tell() == 0:
+            f.write(csv_text([settings]))
+        for alpha, beta in serpentine_order(grid):
+            if (alpha, beta) not in results:
+                cell_stats[(alpha, beta)] = {}
+                min_val, min_member = single_run(m, alpha, beta, perf_cutoff, data, silent=True, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, incumbents=incumbents, checkpoint=checkpoint, cache=cache, stats=cell_stats[(alpha, beta)])
                 print(alpha, beta, min_val, min_member)
-                writer.writerow([alpha,beta,min_val]+min_member)
+                results[(alpha, beta)] = scan_rows(alpha, beta, min_val, min_member, top_k)
+                f.write(csv_text(results[(alpha, beta)]))
+                f.flush()
+                os.fsync(f.fileno())
+            incumbents = [row[-m:] for row in results[(alpha, beta)] if len(row) == len(scan_header(m, top_k))]
+
+    tmp = Path(str(filename)+'.tmp')
+    with open(tmp, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(scan_header(m, top_k))
+        for alpha, beta in grid:
+            writer.writerows(results[(alpha, beta)])
+    os.replace(tmp, filename)
+    os.remove(partial)
+    report_prefilter(cell_stats)
+    write_scan_stats(filename, cell_stats)
     return filename
 
-# finds minimizing subset
-def single_run(m, alpha, beta, perf_cutoff, data, silent=False, min2=False):
-    n = len(data.delta_q)
+# rows as csv text, written at once
+def csv_text(rows):
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return text.getvalue()
+
+# csv rows of the finished cells of a partial scan by (alpha, beta). The last cell is dropped if it
+# may have been cut off (no final newline, or fewer than top_k rows), and the file is rewritten without it.
+# a partial scan started with different settings or data is discarded.
+def read_partial_scan(partial, settings, top_k=None):
+    cells = {}
+    if not partial.exists():
+        return cells
+    with open(partial, 'r', newline='') as f:
+        text = f.read()
+    rows = list(csv.reader(io.StringIO(text)))
+    if len(rows) == 0:
+        return cells
+    if rows[0] != [str(s) for s in settings]:
+        print(f'{partial} was started with different settings or data, starting from the first alpha-beta pair')
+        partial.unlink()
+        return cells
+    for row in rows[1:]:
+        cells.setdefault((float(row[0]), float(row[1])), []).append(row)
+    if len(cells) > 0:
+        last = list(cells)[-1]
+        if not text.endswith('\n') or (top_k and len(cells[last]) < top_k):
+            cells.pop(last)
+    tmp = Path(str(partial)+'.tmp')
+    with open(tmp, 'w', newline='') as f:
+        f.write(csv_text([settings] + [row for cell in cells.values() for row in cell]))
+    os.replace(tmp, partial)
+    return cells
+
+# performance, distance and change as plain DataArrays
+def get_metrics(data):
     perf = xr.DataArray(data.delta_q.data, dims=['member'], coords=dict(member=data.delta_q.coords['member']))
     change_data = data.change.data
     dist_data = data.delta_i.data
     change = xr.DataArray(change_data, dims=['member','member_model'], coords=dict(member=data.change.coords['member'],member_model=data.change.coords['member_model']))
     dist = xr.DataArray(dist_data, dims=['member','member_model'], coords=dict(member=data.delta_i.coords['member'],member_model=data.delta_i.coords['member_model']))
-    min_val, min_members = get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=silent, min2=min2)
+    return perf, dist, change
+
+# finds minimizing subset (or the top_k best subsets)
+# incumbents are subsets (lists of member names), e.g. of a neighbouring alpha-beta pair, that warm start the branch_and_bound solver
+# checkpoint is a file in which the numpy solver saves its progress (see numpy_combination_search)
+# cache is a sqlite result cache (see result cache), results of identical data and settings are returned from it
+# stats is a dict to which solver statistics are added (see add_stats)
+def single_run(m, alpha, beta, perf_cutoff, data, silent=False, min2=False, solver='numpy', top_k=None, shard_workers=1, prefilter=False, incumbents=(), checkpoint=None, cache=None, stats=None):
+    perf, dist, change = get_metrics(data)
+    if top_k and min2:
+        raise ValueError('min2 and top_k cannot be combined, min2 is the second subset of top_k=2')
+    if cache is not None:
+        key = result_cache_key(metrics_digest(perf, dist, change), m, alpha, beta, perf_cutoff, solver, min2, top_k, prefilter)
+        result = cache_get(cache, key, m, top_k)
+        if result is not None:
+            return result
+    if top_k:
+        min_val, min_members = get_best_k_models(perf, dist, change, m, top_k, alpha, beta, perf_cutoff, silent=silent, solver=solver, shard_workers=shard_workers, prefilter=prefilter, incumbents=incumbents, checkpoint=checkpoint, stats=stats)
+    else:
+        min_val, min_members = get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=silent, min2=min2, solver=solver, shard_workers=shard_workers, prefilter=prefilter, incumbents=incumbents, checkpoint=checkpoint, stats=stats)
+    if cache is not None:
+        cache_put(cache, key, min_val, min_members, top_k)
     return min_val, min_members
 
 # normalizing metrics so they contribute equally to the cost function
 def norm_matrices(perf, dist, change, perf_cutoff):
-    members = list(perf.where(perf<perf_cutoff, drop=True).member.data) # drop members above the performance threshold
+    keep = perf.data < perf_cutoff # drop members above the performance threshold
+    members = perf.member.data[keep]
     n = len(members)
-    perf = perf.sel(member=members)
-    dist = dist.sel(member=members, member_model=members)
-    change = change.sel(member=members, member_model=members)
+    eye = np.eye(n, dtype=bool)
+
+    rows = dist.indexes['member'].get_indexer(members)
+    cols = dist.indexes['member_model'].get_indexer(members)
+    dist_data = np.asarray(dist.data, dtype=np.float64)[np.ix_(rows, cols)]
+    rows = change.indexes['member'].get_indexer(members)
+    cols = change.indexes['member_model'].get_indexer(members)
+    change_data = np.asarray(change.data, dtype=np.float64)[np.ix_(rows, cols)]
 
-    norm_dist = (dist - np.nanmean(dist))/np.nanstd(dist)/2 # /2 is due to double count ij, ji
-    norm_change = (change - np.nanmean(change))/np.nanstd(change)/2
+    norm_dist = (dist_data - np.nanmean(dist_data))/np.nanstd(dist_data)/2 # /2 is due to double count ij, ji
+    norm_change = (change_data - np.nanmean(change_data))/np.nanstd(change_data)/2
+    norm_dist[eye] = 0
+    norm_change[eye] = 0
 
     # to save operations, we store the performance on the diagonal elements of the distance matrix
     # and pre-calculate the alpha mix.
-    perf_diag = xr.DataArray(np.diag(perf.data),dims=['member','member_model'],coords=dict(member=members, member_model=members))
-    for i in range(n):
-        for j in range(n):
-            if i==j:
-                continue
-            perf_diag[i,j]=np.nan
-
+    perf_diag = np.where(eye, np.asarray(perf.data, dtype=np.float64)[keep], np.nan)
     norm_perf = (perf_diag - np.nanmean(perf_diag))/np.nanstd(perf_diag)
+    norm_perf[~eye] = 0
 
-    for i in range(n):
-        for j in range(n):
-            if i==j:
-                norm_dist[i,j] = 0
-                norm_change[i,j] = 0
-            else:
-                norm_perf[i,j]=0
+    coords = dict(member=members, member_model=members)
+    dims = ['member','member_model']
+    return xr.DataArray(norm_perf, dims=dims, coords=coords), xr.DataArray(norm_dist, dims=dims, coords=coords), xr.DataArray(norm_change, dims=dims, coords=coords)
 
-    return norm_perf, norm_dist, norm_change
+# number of (data, perf_cutoff) normalizations kept by cached_norm_matrices
+NORM_CACHE_SIZE = 8
+norm_cache = {}
 
-# check all combinations to determine the cost-function-minimizing subset
-def get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=True, min2=False):
-    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
-    n = len(members)
-    if not silent:
-        print(f'using {n} models with perf < {perf_cutoff}')
+# digest of the member labels and values of the metrics, identifies the data independent of the objects
+def metrics_digest(perf, dist, change):
+    digest = hashlib.blake2b(digest_size=16)
+    for da in (perf, dist, change):
+        for dim in da.dims:
+            digest.update('\0'.join(str(label) for label in da.indexes[dim]).encode())
+        digest.update(np.ascontiguousarray(da.data, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+# norm_matrices computed once per (data, perf_cutoff) and shared by all alpha-beta pairs of a scan.
+# the returned arrays are shared, do not modify them in place
+def cached_norm_matrices(perf, dist, change, perf_cutoff):
+    key = (metrics_digest(perf, dist, change), perf_cutoff)
+    if key not in norm_cache:
+        if len(norm_cache) >= NORM_CACHE_SIZE:
+            norm_cache.pop(next(iter(norm_cache)))
+        norm_cache[key] = norm_matrices(perf, dist, change, perf_cutoff)
+    return norm_cache[key]
+
+# number of combinations scored at once by the numpy solver
+COMBINATION_CHUNK_SIZE = 2**15
+
+# n choose m
+def n_combinations(n, m):
+    if m > n:
+        return 0
+    return math.factorial(n) // (math.factorial(m) * math.factorial(n-m))
+
+# prints progress of a running combination search
+def print_progress(i, total_combinations, start_time, val, combo, members):
+    percent = i / total_combinations
+    eta = (1-percent) * (time.time() - start_time) / percent
+    print(f"{100*percent:>4.1f}% / eta in {eta/60:.1f} min / best score {val:.3f}")
+    print(f"{', '.join([members[j] for j in combo])}")
+
+# yields all combinations of m out of range(n) as (chunk_size, m) index arrays
+def combination_chunks(n, m, chunk_size=COMBINATION_CHUNK_SIZE):
+    combos = itertools.combinations(range(n), m)
+    while True:
+        chunk = np.fromiter(itertools.chain.from_iterable(itertools.islice(combos, chunk_size)), dtype=np.intp)
+        if chunk.size == 0:
+            return
+        yield chunk.reshape(-1, m)
+
+# cost of each combination (rows of combos) as the sum over the m x m sub-matrix
+def combination_costs(cost, combos):
+    k, m = combos.shape
+    return cost[combos[:, :, None], combos[:, None, :]].reshape(k, m*m).sum(axis=1)
 
-    norm_perf, norm_dist, norm_change = norm_matrices(perf, dist, change, perf_cutoff)
-    cost_matrix = (1-alpha-beta) * norm_perf - alpha * norm_dist - beta * norm_change
+# pushes new (cost, rank, combo) candidates onto a bounded max-heap that keeps the k lowest (cost, rank),
+# i.e. the k best subsets of a sequential scan with strict comparisons. The root is the worst retained one.
+def push_candidates(heap, new_candidates, k):
+    for val, rank, combo in new_candidates:
+        item = (-val, -rank, combo)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return heap
+
+# the retained (cost, rank, combo) candidates from best to worst
+def sorted_candidates(heap):
+    return sorted([(-val, -rank, combo) for val, rank, combo in heap], key=lambda c: (c[0], c[1]))
+
+# value of the current incumbent, i.e. the cost a combination has to beat to change the result
+def incumbent_threshold(heap, k):
+    return -heap[0][0] if len(heap) >= k else np.inf
+
+# reference implementation, scores each combination with xarray (k <= 2)
+def xarray_combination_search(cost_matrix, members, m, k, silent, start_time):
+    if k > 2:
+        raise ValueError(f'the xarray solver finds the best or second best subset only (k <= 2), not k={k}; use another solver for top_k > 2')
+    min2 = k == 2
+    n = len(members)
+    total_combinations = n_combinations(n, m)
 
     def cost_function(combo):
         return cost_matrix.isel(member=combo, member_model=combo).sum()
 
-    # now we check for all combinations (n choose m) many
     min_val, min_combo = np.inf, []
-    if min2:
-        min2_val, min2_combo = np.inf, []
+    min2_val, min2_combo = np.inf, []
 
-    total_combinations = int(math.factorial(n) / math.factorial(m) / math.factorial(n-m))
-    start_time = time.time()
-
-    for i, combo in enumerate(itertools.combinations(range(len(members)), m)):
+    for i, combo in enumerate(itertools.combinations(range(n), m)):
         cost = cost_function(list(combo))
         if cost < min_val:
             if min2:
@@ -392,24 +681,848 @@ def get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=Tr
             min2_combo = combo
             min2_val = cost.data
 
-        minX_val = min_val
-        minX_combo = min_combo
-        if min2:
-            minX_val = min2_val
-            minX_combo = min2_combo
-        minX_members = [members[i] for i in minX_combo]
-
         # this part displays progress, requires silent = False
         if not silent and i & 0b1111111111111 == 0:
             if i == 0:
                 continue
-            percent = i / total_combinations
-            eta = (1-percent) * (time.time() - start_time) / percent
-            print(f"{100*percent:>4.1f}% / eta in {eta/60:.1f} min / best score {minX_val:.3f}")
-            print(f"{', '.join(minX_members )}")
+            if min2:
+                print_progress(i, total_combinations, start_time, min2_val, min2_combo, members)
+            else:
+                print_progress(i, total_combinations, start_time, min_val, min_combo, members)
+
+    candidates = [(val, rank, combo) for rank, (val, combo) in enumerate([(min_val, min_combo), (min2_val, min2_combo)][:k])]
+    return [c for c in candidates if np.isfinite(c[0])]
+
+# plain float64 copy of the cost matrix
+def numpy_cost_matrix(cost_matrix):
+    cost = np.ascontiguousarray(cost_matrix.data, dtype=np.float64)
+    return np.where(np.isnan(cost), 0., cost) # same as the skipna sum of xarray
+
+# (cost, rank, combo) of the k lowest costs of a block of scored combinations (more in case of ties)
+def chunk_candidates(costs, combos, offset, k):
+    if k == 1:
+        idx = [int(np.argmin(costs))]
+    elif k < len(costs):
+        idx = np.flatnonzero(costs <= np.partition(costs, k-1)[k-1])
+    else:
+        idx = range(len(costs))
+    return [(costs[j], offset + j, tuple(combos[j].tolist())) for j in idx]
+
+# seconds between two checkpoints of a running enumeration
+CHECKPOINT_INTERVAL = 600
+
+# identifies the search a checkpoint belongs to
+def checkpoint_key(cost, m, k):
+    digest = hashlib.blake2b(np.ascontiguousarray(cost).tobytes(), digest_size=16)
+    digest.update(f'{cost.shape} {m} {k}'.encode())
+    return digest.hexdigest()
+
+# writes the rank of the next combination, the retained candidates and the elapsed time (atomic rename)
+def save_checkpoint(checkpoint, key, rank, heap, elapsed):
+    state = dict(key=key, rank=int(rank), elapsed=float(elapsed),
+                 candidates=[[float(-val), int(-r), [int(i) for i in combo]] for val, r, combo in heap])
+    tmp = Path(str(checkpoint)+'.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, checkpoint)
+
+# state of a checkpoint of the same search, None if there is none
+def load_checkpoint(checkpoint, key):
+    if checkpoint is None or not Path(checkpoint).exists():
+        return None
+    with open(checkpoint, 'r') as f:
+        state = json.load(f)
+    if state['key'] != key:
+        print(f'{checkpoint} belongs to a different search, starting from the first combination')
+        return None
+    return state
+
+# scores blocks of combinations at once on a plain float64 copy of the cost matrix.
+# with a checkpoint file, the progress is saved every CHECKPOINT_INTERVAL seconds and a restarted
+# search with the same inputs continues from the saved rank (the file is removed when done)
+def numpy_combination_search(cost_matrix, members, m, k, silent, start_time, checkpoint=None):
+    n = len(members)
+    total_combinations = n_combinations(n, m)
+    cost = numpy_cost_matrix(cost_matrix)
+
+    heap = []
+    offset = 0
+    if checkpoint is not None:
+        key = checkpoint_key(cost, m, k)
+        state = load_checkpoint(checkpoint, key)
+        if state is not None:
+            heap = [(-val, -rank, tuple(combo)) for val, rank, combo in state['candidates']]
+            heapq.heapify(heap)
+            offset = state['rank']
+            start_time -= state['elapsed']
+            if not silent:
+                print(f"resuming at combination {offset} of {total_combinations} after {state['elapsed']/60:.1f} min")
+        last_save = time.time()
+
+    if offset == 0:
+        chunks = combination_chunks(n, m)
+    elif offset < total_combinations:
+        chunks = combination_chunks_from(n, m, offset, total_combinations-offset)
+    else:
+        chunks = []
+    for combos in chunks:
+        costs = combination_costs(cost, combos)
+        push_candidates(heap, chunk_candidates(costs, combos, offset, k), k)
+        offset += len(combos)
+
+        if not silent and offset < total_combinations:
+            print_progress(offset, total_combinations, start_time, -heap[0][0], heap[0][2], members)
+        if checkpoint is not None and time.time() - last_save > CHECKPOINT_INTERVAL:
+            save_checkpoint(checkpoint, key, offset, heap, time.time() - start_time)
+            last_save = time.time()
+
+    if checkpoint is not None and Path(checkpoint).exists():
+        os.remove(checkpoint)
+    return sorted_candidates(heap)
+
+# combination of m out of range(n) at position rank of the lexicographic order of itertools.combinations
+def unrank_combination(n, m, rank):
+    if not 0 <= rank < n_combinations(n, m):
+        raise ValueError(f'rank {rank} out of range for {n} choose {m}')
+    combo = []
+    x = 0
+    for i in range(m):
+        while True:
+            count = n_combinations(n-1-x, m-1-i) # combinations with x at position i
+            if rank < count:
+                break
+            rank -= count
+            x += 1
+        combo.append(x)
+        x += 1
+    return tuple(combo)
+
+# position of a sorted combination of m out of range(n) in the lexicographic order (inverse of unrank_combination)
+def rank_combination(n, m, combo):
+    rank = 0
+    previous = -1
+    for i, x in enumerate(combo):
+        for y in range(previous+1, x):
+            rank += n_combinations(n-1-y, m-1-i)
+        previous = x
+    return rank
+
+# yields count combinations in lexicographic order, starting at the combination of rank start,
+# as (chunk_size, m) index arrays. The tail after the start combination is a sequence of blocks
+# prefix + combinations(range(x+1, n), r), each generated by itertools.
+def combination_chunks_from(n, m, start, count, chunk_size=COMBINATION_CHUNK_SIZE):
+    first = unrank_combination(n, m, start)
+
+    def blocks():
+        yield np.array([first], dtype=np.intp)
+        for j in range(m-1, -1, -1):
+            r = m-1-j
+            for x in range(first[j]+1, n-r):
+                prefix = np.array(first[:j] + (x,), dtype=np.intp)
+                if r == 0:
+                    yield prefix[None, :]
+                    continue
+                for suffix in combination_chunks(n-x-1, r, chunk_size):
+                    yield np.hstack([np.broadcast_to(prefix, (len(suffix), j+1)), suffix + x + 1])
+
+    buffer, buffered = [], 0
+    for block in blocks():
+        block = block[:count]
+        buffer.append(block)
+        buffered += len(block)
+        count -= len(block)
+        if buffered >= chunk_size or count == 0:
+            yield np.concatenate(buffer)
+            buffer, buffered = [], 0
+        if count == 0:
+            return
+
+# k best (cost, rank, combo) among count combinations starting at rank start, run in a worker process
+def search_shard(cost, m, k, start, count):
+    heap = []
+    offset = start
+    for combos in combination_chunks_from(len(cost), m, start, count):
+        costs = combination_costs(cost, combos)
+        push_candidates(heap, chunk_candidates(costs, combos, offset, k), k)
+        offset += len(combos)
+    return [(-val, -rank, combo) for val, rank, combo in heap]
+
+# number of shards per worker, more shards than workers balance the load
+SHARDS_PER_WORKER = 4
+
+# splits the lexicographic combination ranks [0, n choose m) into intervals, searches them on a
+# process pool and reduces the per-shard candidates (ranks are global, so ties are broken as in a serial scan)
+def sharded_combination_search(cost_matrix, members, m, k, silent, start_time, shard_workers):
+    n = len(members)
+    total_combinations = n_combinations(n, m)
+    if not 0 < m <= n:
+        return []
+    cost = numpy_cost_matrix(cost_matrix)
+    nshards = min(shard_workers * SHARDS_PER_WORKER, total_combinations)
+    bounds = [total_combinations * i // nshards for i in range(nshards+1)]
+
+    heap = []
+    with ProcessPoolExecutor(max_workers=shard_workers) as pool:
+        futures = [pool.submit(search_shard, cost, m, k, start, end-start) for start, end in zip(bounds[:-1], bounds[1:])]
+        for i, future in enumerate(futures):
+            push_candidates(heap, future.result(), k)
+            if not silent and i < len(futures)-1:
+                print_progress(bounds[i+1], total_combinations, start_time, -heap[0][0], heap[0][2], members)
+    return sorted_candidates(heap)
+
+# bounds within this tolerance of the incumbent are not pruned (rounding of the incremental partial costs)
+BOUND_TOLERANCE = 1e-9
+
+# exact search that grows partial subsets in lexicographic order and prunes a branch once a lower bound
+# on its cost exceeds the incumbent. Leaves are visited in the order of itertools.combinations and only
+# strictly worse branches are pruned, so the k best subsets (including ties) are the same as for exhaustive search.
+#
+# For a partial subset S and r members R still to add from the candidates P, the cost is
+# cost(S) + sum_{j in R} (c_jj + sum_{i in S} p_ij) + sum_{j<l in R} p_jl with p = c + c^T,
+# which is bounded below by cost(S) plus the r smallest of c_jj + sum_{i in S} p_ij + (r-1)/2 min_{l in P} p_jl.
+#
+# incumbents (index tuples, e.g. the optimum of a neighbouring alpha-beta pair) are scored first, so that
+# the search starts with a finite threshold; being real subsets, they do not change the result.
+# the numbers of nodes visited and pruned and of leaves scored are added to stats (see add_stats)
+def branch_and_bound_search(cost_matrix, members, m, k, silent, start_time, incumbents=(), stats=None):
+    n = len(members)
+    cost = numpy_cost_matrix(cost_matrix)
+    diag = np.diag(cost).copy()
+    pair = cost + cost.T
+    pair_offdiag = pair.copy()
+    np.fill_diagonal(pair_offdiag, np.inf)
+
+    heap = []
+    counts = dict(nodes=0, pruned=0, leaves=0)
+
+    seeded = set()
+    for combo in incumbents:
+        combo = tuple(sorted(int(i) for i in combo))
+        if len(set(combo)) != m or not 0 <= combo[0] <= combo[-1] < n:
+            continue
+        rank = rank_combination(n, m, combo)
+        if rank not in seeded:
+            seeded.add(rank)
+            push_candidates(heap, [(combination_costs(cost, np.array([combo], dtype=np.intp))[0], rank, combo)], k)
+
+    def lower_bound(partial_cost, interaction, pool, r):
+        g = diag[pool] + interaction[pool]
+        if r > 1:
+            g = g + (r-1)/2 * pair_offdiag[np.ix_(pool, pool)].min(axis=1)
+        return partial_cost + np.partition(g, r-1)[:r].sum()
+
+    def visit(combo, last, partial_cost, interaction):
+        r = m - len(combo)
+        pool = np.arange(last+1, n)
+        counts['nodes'] += 1
+        threshold = incumbent_threshold(heap, k)
+        if np.isfinite(threshold) and lower_bound(partial_cost, interaction, pool, r) > threshold + BOUND_TOLERANCE:
+            counts['pruned'] += 1
+            return
+        if r == 1:
+            combos = np.array([combo + [j] for j in pool], dtype=np.intp)
+            costs = combination_costs(cost, combos)
+            # the leaves are consecutive in lexicographic order, incumbents are already in the heap
+            candidates = chunk_candidates(costs, combos, rank_combination(n, m, combos[0]), k)
+            push_candidates(heap, [c for c in candidates if c[1] not in seeded], k)
+            counts['leaves'] += len(combos)
+            return
+        for j in range(last+1, n-r+1):
+            visit(combo + [j], j, partial_cost + diag[j] + interaction[j], interaction + pair[j])
+
+    if 0 < m <= n:
+        visit([], -1, 0., np.zeros(n))
+
+    add_stats(stats, **counts)
+    if not silent:
+        print(f"branch and bound visited {counts['nodes']} nodes and pruned {counts['pruned']}, "
+              f"{counts['leaves']} of {n_combinations(n, m)} combinations were scored")
+    return sorted_candidates(heap)
+
+# yields (removed, added) member indices that walk through all combinations of m out of range(n)
+# in revolving-door order, starting from range(m) (Knuth, TAOCP 7.2.1.3, Algorithm R)
+def revolving_door_swaps(n, m):
+    c = list(range(m)) + [n]
+    while True:
+        if m % 2 == 1:
+            if c[0] + 1 < c[1]:
+                c[0] += 1
+                yield c[0]-1, c[0]
+                continue
+            increase = False
+        else:
+            if c[0] > 0:
+                c[0] -= 1
+                yield c[0]+1, c[0]
+                continue
+            increase = True
+        j = 2
+        while j <= m:
+            if not increase:
+                # try to decrease c_j
+                if c[j-1] >= j:
+                    removed, added = c[j-1], j-2
+                    c[j-1], c[j-2] = c[j-2], j-2
+                    break
+            else:
+                # try to increase c_j
+                if c[j-1] + 1 < c[j]:
+                    removed, added = c[j-2], c[j-1]+1
+                    c[j-2], c[j-1] = c[j-1], c[j-1]+1
+                    break
+            increase = not increase
+            j += 1
+        else:
+            return
+        yield removed, added
+
+# incremental costs are recomputed from scratch after this many swaps
+RESCORE_INTERVAL = 4096
+# combinations within this tolerance of the incumbent are kept and rescored exactly at the end
+INCREMENTAL_TOLERANCE = 1e-9
+
+# walks the combinations in revolving-door order, where consecutive combinations differ by one member,
+# and updates the cost with the row and column of the swapped members only (O(m) instead of O(m^2))
+def revolving_door_search(cost_matrix, members, m, k, silent, start_time):
+    n = len(members)
+    total_combinations = n_combinations(n, m)
+    if not 0 < m <= n:
+        return []
+    cost = numpy_cost_matrix(cost_matrix)
+    diag = np.diag(cost).tolist()
+    pair = (cost + cost.T).tolist()
+
+    def exact_cost(combo):
+        return combination_costs(cost, np.array([sorted(combo)], dtype=np.intp))[0]
+
+    near = [] # (incremental cost, combo) of all combinations close to the incumbent
+    threshold = np.inf
+
+    current = list(range(m))
+    val = exact_cost(current)
+    swaps = revolving_door_swaps(n, m)
+    i = 0
+    while True:
+        if val <= threshold + INCREMENTAL_TOLERANCE:
+            near.append((val, tuple(sorted(current))))
+            near.sort()
+            if len(near) >= k:
+                threshold = near[k-1][0]
+                near = [c for c in near if c[0] <= threshold + INCREMENTAL_TOLERANCE]
+
+        if not silent and i & 0xFFFFF == 0 and i > 0:
+            print_progress(i, total_combinations, start_time, near[k-1][0] if len(near) >= k else np.inf,
+                           near[k-1][1] if len(near) >= k else [], members)
+
+        swap = next(swaps, None)
+        if swap is None:
+            break
+        removed, added = swap
+        current.remove(removed)
+        row_removed, row_added = pair[removed], pair[added]
+        val += diag[added] - diag[removed]
+        for j in current:
+            val += row_added[j] - row_removed[j]
+        current.append(added)
+        i += 1
+        if i % RESCORE_INTERVAL == 0:
+            val = exact_cost(current)
+
+    # rescore the retained combinations exactly, ties are broken in itertools.combinations order
+    return sorted([(exact_cost(combo), rank_combination(n, m, combo), combo) for _, combo in near], key=lambda c: (c[0], c[1]))[:k]
+
+# enumerates the combinations in lexicographic order with the cost of each prefix kept, so only the
+# positions that changed are rescored. Keeps the keep lowest (cost, rank) in sorted arrays.
+# Compiled with numba (nopython) when it is installed, see numba_combination_search.
+def combination_kernel(cost, m, keep):
+    n = cost.shape[0]
+    vals = np.full(keep, np.inf)
+    ranks = np.full(keep, -1, dtype=np.int64)
+    combos = np.zeros((keep, m), dtype=np.int64)
+    c = np.arange(m)
+    partial = np.zeros(m+1) # partial[i+1] is the cost of c[0], ..., c[i]
+    changed = 0
+    rank = 0
+    while True:
+        for i in range(changed, m):
+            val = partial[i] + cost[c[i], c[i]]
+            for j in range(i):
+                val += cost[c[i], c[j]] + cost[c[j], c[i]]
+            partial[i+1] = val
+        val = partial[m]
+        if val < vals[keep-1]:
+            pos = keep-1
+            while pos > 0 and vals[pos-1] > val:
+                vals[pos] = vals[pos-1]
+                ranks[pos] = ranks[pos-1]
+                combos[pos, :] = combos[pos-1, :]
+                pos -= 1
+            vals[pos] = val
+            ranks[pos] = rank
+            combos[pos, :] = c
+        rank += 1
+
+        # next combination in lexicographic order
+        i = m-1
+        while i >= 0 and c[i] == n-m+i:
+            i -= 1
+        if i < 0:
+            break
+        c[i] += 1
+        for j in range(i+1, m):
+            c[j] = c[j-1] + 1
+        changed = i
+    return vals, ranks, combos
+
+# the machine code is cached next to the module (__pycache__), so that each process does not compile it again
+if numba is not None:
+    compiled_combination_kernel = numba.njit(nogil=True, cache=True)(combination_kernel)
+else:
+    compiled_combination_kernel = None
+
+# the compiled kernel keeps this many candidates more than requested, they are rescored with the
+# numpy summation so that near-ties are resolved as in the numpy solver
+NUMBA_EXTRA_CANDIDATES = 8
+
+# runs the enumeration entirely in compiled code, falls back to the numpy solver if numba is missing
+def numba_combination_search(cost_matrix, members, m, k, silent, start_time):
+    if compiled_combination_kernel is None:
+        warnings.warn('numba is not installed, using the numpy solver instead')
+        return numpy_combination_search(cost_matrix, members, m, k, silent, start_time)
+    if not 0 < m <= len(members):
+        return []
+    cost = numpy_cost_matrix(cost_matrix)
+    vals, ranks, combos = compiled_combination_kernel(cost, m, k + NUMBA_EXTRA_CANDIDATES)
+    found = ranks >= 0
+    combos = combos[found].astype(np.intp)
+    exact = combination_costs(cost, combos)
+    candidates = zip(exact, ranks[found].tolist(), [tuple(c) for c in combos.tolist()])
+    return sorted(candidates, key=lambda c: (c[0], c[1]))[:k]
+
+# subsets whose objective is within this (relative) of the optimum count as tied
+MILP_TIE_TOLERANCE = 1e-9
+
+# solves min x^T c x subject to sum(x) = m for binary x as a mixed-integer linear program (scipy/HiGHS).
+# The pairwise terms are linearized with y_ij = x_i x_j (i < j) through y_ij <= x_i, y_ij <= x_j and
+# y_ij >= x_i + x_j - 1, strengthened by sum_j y_ij = (m-1) x_i. Further subsets are found by excluding
+# the previous ones (sum_{i in S} x_i <= m-1); of tied subsets the first in combination order is taken.
+# Returns the candidates (cost, rank, combo) and the optimality gap of each solve.
+def milp_subset_search(cost, m, k, time_limit=None, silent=True):
+    try:
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy import sparse
+    except ImportError:
+        raise ImportError('the milp solver requires scipy >= 1.9')
+    n = len(cost)
+    if not 0 < m <= n:
+        return [], []
+    pair = cost + cost.T
+    ii, jj = np.triu_indices(n, 1)
+    npairs = len(ii)
+    nvars = n + npairs
+    objective = np.concatenate([np.diag(cost), pair[ii, jj]])
+    y = n + np.arange(npairs)
+    ones = np.ones(npairs)
+
+    # y_ij - x_i <= 0, y_ij - x_j <= 0, x_i + x_j - y_ij <= 1
+    rows = np.arange(npairs)
+    upper_i = sparse.csr_matrix((np.concatenate([ones, -ones]), (np.concatenate([rows, rows]), np.concatenate([y, ii]))), shape=(npairs, nvars))
+    upper_j = sparse.csr_matrix((np.concatenate([ones, -ones]), (np.concatenate([rows, rows]), np.concatenate([y, jj]))), shape=(npairs, nvars))
+    lower = sparse.csr_matrix((np.concatenate([ones, ones, -ones]), (np.concatenate([rows, rows, rows]), np.concatenate([ii, jj, y]))), shape=(npairs, nvars))
+    # sum_j y_ij - (m-1) x_i = 0
+    degree = sparse.csr_matrix((np.concatenate([ones, ones, -(m-1)*np.ones(n)]),
+                                (np.concatenate([ii, jj, np.arange(n)]), np.concatenate([y, y, np.arange(n)]))), shape=(n, nvars))
+    size = sparse.csr_matrix((np.ones(n), (np.zeros(n, dtype=int), np.arange(n))), shape=(1, nvars))
+    constraints = [LinearConstraint(upper_i, -np.inf, 0), LinearConstraint(upper_j, -np.inf, 0),
+                   LinearConstraint(lower, -np.inf, 1), LinearConstraint(degree, 0, 0), LinearConstraint(size, m, m)]
+    integrality = np.concatenate([np.ones(n), np.zeros(npairs)])
+
+    options = dict(disp=not silent, mip_rel_gap=0)
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+    bounds = Bounds(np.zeros(nvars), np.ones(nvars))
+
+    def solve(constraints, bounds=bounds):
+        return milp(objective, constraints=constraints, integrality=integrality, bounds=bounds, options=options)
+
+    def exclusion(combo):
+        exclude = np.zeros((1, nvars))
+        exclude[0, list(combo)] = 1
+        return LinearConstraint(exclude, -np.inf, m-1)
+
+    # lexicographically first subset with an objective of at most limit, members are fixed one at a time
+    def first_optimum(constraints, limit):
+        constraints = constraints + [LinearConstraint(objective[None, :], -np.inf, limit)]
+        lb, ub = np.zeros(nvars), np.ones(nvars)
+        chosen = []
+        for i in range(n):
+            if len(chosen) == m:
+                break
+            lb[i] = 1
+            if solve(constraints, Bounds(lb, ub)).x is not None:
+                chosen.append(i)
+            else:
+                lb[i], ub[i] = 0, 0
+        return tuple(chosen) if len(chosen) == m else None
+
+    candidates, gaps = [], []
+    res = solve(constraints)
+    while len(candidates) < k and res.x is not None:
+        combo = tuple(np.flatnonzero(res.x[:n] > 0.5).tolist())
+        val = combination_costs(cost, np.array([combo], dtype=np.intp))[0]
+        gap = res.mip_gap if res.mip_gap is not None else np.nan
+        # another subset with the same cost: take the first in combination order, as the enumerating solvers
+        following = solve(constraints + [exclusion(combo)])
+        limit = val + MILP_TIE_TOLERANCE * max(1., abs(val))
+        if following.x is not None and following.fun <= limit:
+            first = first_optimum(constraints, limit)
+            if first is not None and first != combo:
+                combo, following = first, None
+                val = combination_costs(cost, np.array([combo], dtype=np.intp))[0]
+        candidates.append((val, rank_combination(n, m, combo), combo))
+        gaps.append(gap)
+        if not silent:
+            print(f"milp subset {len(candidates)-1}: {res.message} (gap {gap})")
+        constraints.append(exclusion(combo))
+        res = following if following is not None else solve(constraints)
+    return candidates, gaps
+
+# exact solution of the subset problem as an integer program, independent of n choose m
+def milp_combination_search(cost_matrix, members, m, k, silent, start_time):
+    return milp_subset_search(numpy_cost_matrix(cost_matrix), m, k, silent=silent)[0]
+
+# solves the cost function minimization as an integer program with an optional time limit (in seconds)
+# returns the best subset found, its cost and the optimality gap (0 if it was proven optimal)
+def get_best_m_models_milp(perf, dist, change, m, alpha, beta, perf_cutoff, time_limit=None, silent=True, min2=False):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    if not silent:
+        print(f'using {len(members)} models with perf < {perf_cutoff}')
+    cost_matrix = get_cost_matrix(perf, dist, change, alpha, beta, perf_cutoff)
+    k = 2 if min2 else 1
+    start_time = time.time()
+    candidates, gaps = milp_subset_search(numpy_cost_matrix(cost_matrix), m, k, time_limit=time_limit, silent=silent)
+    if not silent:
+        print(f"milp took {(time.time() - start_time)/60:.1f} min")
+    if len(candidates) < k:
+        return np.inf, [], np.nan
+    min_val, _, min_combo = candidates[k-1]
+    return min_val, [members[i] for i in min_combo], gaps[k-1]
+
+# improvements smaller than this are not accepted by the local search (rounding)
+SWAP_TOLERANCE = 1e-12
+# number of simulated annealing runs of the heuristic solver and steps per run
+ANNEALING_RESTARTS = 8
+ANNEALING_STEPS = 20000
+
+# diagonal and pair matrix p = c + c^T (with zero diagonal) used by the heuristics,
+# the cost of a subset S is sum_{i in S} c_ii + sum_{i<j in S} p_ij
+def heuristic_matrices(cost):
+    pair = cost + cost.T
+    np.fill_diagonal(pair, 0.)
+    return np.diag(cost).copy(), pair
+
+# greedy construction, adds the member with the lowest added cost until m members are chosen
+def greedy_subset(diag, pair, m):
+    chosen = []
+    interaction = np.zeros(len(diag))
+    for _ in range(m):
+        added = diag + interaction
+        added[chosen] = np.inf
+        j = int(np.argmin(added))
+        chosen.append(j)
+        interaction += pair[j]
+    return sorted(chosen)
+
+# subsets visited by the heuristics, a bounded heap of the k best distinct ones (see push_candidates)
+# plus the set of all subsets pushed so far
+def heuristic_visits(cost, k):
+    return dict(cost=cost, k=k, heap=[], seen=set())
+
+# scores the subsets not visited before exactly and keeps the k best as (cost, rank, combo)
+def visit_subsets(visited, combos):
+    if visited is None:
+        return
+    new = [combo for combo in dict.fromkeys(tuple(sorted(int(i) for i in combo)) for combo in combos)
+           if combo not in visited['seen']]
+    if len(new) == 0:
+        return
+    visited['seen'].update(new)
+    cost = visited['cost']
+    n, m = len(cost), len(new[0])
+    costs = combination_costs(cost, np.array(new, dtype=np.intp))
+    push_candidates(visited['heap'], [(costs[i], rank_combination(n, m, combo), combo) for i, combo in enumerate(new)], visited['k'])
+
+# cost a visited subset has to beat to enter the heap
+def visit_threshold(visited):
+    return incumbent_threshold(visited['heap'], visited['k'])
+
+# steepest descent over 1-swaps (one member exchanged) and, once none improves, 2-swaps.
+# the subsets on the way and the k best 1-swap neighbours of each are recorded in visited
+def local_search(diag, pair, combo, visited=None):
+    chosen = np.zeros(len(diag), dtype=bool)
+    chosen[list(combo)] = True
+    while True:
+        inside, outside = np.flatnonzero(chosen), np.flatnonzero(~chosen)
+        visit_subsets(visited, [inside])
+        if len(inside) == 0 or len(outside) == 0:
+            break
+        # contribution of a member of the subset, or added cost of a member outside of it
+        contribution = diag + pair[:, inside].sum(axis=1)
+
+        # swap i (inside) for j (outside)
+        delta = contribution[outside][None, :] - pair[np.ix_(inside, outside)] - contribution[inside][:, None]
+        if visited is not None:
+            near = np.argsort(delta, axis=None)[:visited['k']]
+            visit_subsets(visited, [np.append(np.delete(inside, i), outside[j]) for i, j in zip(*np.unravel_index(near, delta.shape))])
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[i, j] < -SWAP_TOLERANCE:
+            chosen[inside[i]], chosen[outside[j]] = False, True
+            continue
+
+        # swap i1, i2 (inside) for j1, j2 (outside)
+        if len(inside) < 2 or len(outside) < 2:
+            break
+        pi, qi = np.triu_indices(len(inside), 1)
+        po, qo = np.triu_indices(len(outside), 1)
+        i1, i2, j1, j2 = inside[pi], inside[qi], outside[po], outside[qo]
+        removed = pair[i1, i2] - contribution[i1] - contribution[i2]
+        added = contribution[j1] + contribution[j2] + pair[j1, j2]
+        cross = pair[np.ix_(j1, i1)] + pair[np.ix_(j1, i2)] + pair[np.ix_(j2, i1)] + pair[np.ix_(j2, i2)]
+        delta = added[:, None] + removed[None, :] - cross
+        j, i = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[j, i] < -SWAP_TOLERANCE:
+            chosen[[i1[i], i2[i]]] = False
+            chosen[[j1[j], j2[j]]] = True
+            continue
+        break
+    return np.flatnonzero(chosen).tolist()
+
+# simulated annealing over random 1-swaps with geometric cooling, followed by a local search of the best subset.
+# the accepted subsets that can enter the heap are recorded in visited
+def simulated_annealing(diag, pair, m, seed, steps=ANNEALING_STEPS, visited=None):
+    rng = np.random.default_rng(seed)
+    n = len(diag)
+    chosen = rng.choice(n, m, replace=False).tolist()
+    outside = [j for j in range(n) if j not in chosen]
+    if len(outside) == 0:
+        visit_subsets(visited, [chosen])
+        return sorted(chosen)
+    interaction = pair[:, chosen].sum(axis=1)
+    val = diag[chosen].sum() + interaction[chosen].sum() / 2
+    best_val, best = val, list(chosen)
+    visit_subsets(visited, [chosen])
+
+    pos_in, pos_out = rng.integers(m, size=steps), rng.integers(len(outside), size=steps)
+    uniform = rng.random(steps)
+    # start at the typical size of a move, end three orders of magnitude below
+    sample = [diag[outside[b]] + interaction[outside[b]] - pair[outside[b], chosen[a]] - diag[chosen[a]] - interaction[chosen[a]]
+              for a, b in zip(pos_in[:100], pos_out[:100])]
+    t_start = max(np.mean(np.abs(sample)), SWAP_TOLERANCE)
+    cooling = 1e-3 ** (1 / steps)
+
+    temperature = t_start
+    for step in range(steps):
+        a, b = pos_in[step], pos_out[step]
+        i, j = chosen[a], outside[b]
+        delta = diag[j] + interaction[j] - pair[j, i] - diag[i] - interaction[i]
+        if delta < 0 or uniform[step] < math.exp(-delta / temperature):
+            chosen[a], outside[b] = j, i
+            interaction += pair[j] - pair[i]
+            val += delta
+            if val < best_val:
+                best_val, best = val, list(chosen)
+            if visited is not None and val <= visit_threshold(visited) + INCREMENTAL_TOLERANCE:
+                visit_subsets(visited, [chosen])
+        temperature *= cooling
+    return local_search(diag, pair, best, visited)
+
+# one simulated annealing restart, returns the k best distinct subsets it visited as (cost, rank, combo)
+# and the set of subsets it visited
+def annealing_candidates(cost, m, k, seed, steps=ANNEALING_STEPS):
+    diag, pair = heuristic_matrices(cost)
+    visited = heuristic_visits(cost, k)
+    simulated_annealing(diag, pair, m, seed, steps, visited)
+    return sorted_candidates(visited['heap']), visited['seen']
+
+# greedy construction with local search plus simulated annealing restarts (on a process pool if max_workers > 1)
+# returns the k best distinct subsets visited by any of them as (cost, rank, combo) from best to worst.
+# the number of distinct subsets scored is added to stats as visited
+def heuristic_subset_search(cost, m, k=1, restarts=ANNEALING_RESTARTS, max_workers=1, seed=0, stats=None):
+    n = len(cost)
+    if not 0 < m <= n:
+        return []
+    diag, pair = heuristic_matrices(cost)
+    visited = heuristic_visits(cost, k)
+    local_search(diag, pair, greedy_subset(diag, pair, m), visited)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(annealing_candidates, cost, m, k, seed+r) for r in range(restarts)]
+            restart_candidates = [future.result() for future in futures]
+    else:
+        restart_candidates = [annealing_candidates(cost, m, k, seed+r) for r in range(restarts)]
+    seen = set(visited['seen'])
+    for candidates, restart_seen in restart_candidates:
+        visit_subsets(visited, [combo for _, _, combo in candidates])
+        seen |= restart_seen
+    add_stats(stats, visited=len(seen))
+    return sorted_candidates(visited['heap'])
+
+# heuristic search (not guaranteed to be optimal), for quick scans of large ensembles.
+# the restarts run on max_workers processes
+def heuristic_combination_search(cost_matrix, members, m, k, silent, start_time, max_workers=1, stats=None):
+    candidates = heuristic_subset_search(numpy_cost_matrix(cost_matrix), m, k, max_workers=max_workers, stats=stats)
+    if not silent:
+        print(f"heuristic search kept the {len(candidates)} best distinct subsets visited")
+    return candidates
+
+# upper limit of n choose m for which the heuristic is compared to the exhaustive optimum
+HEURISTIC_REPORT_LIMIT = 5_000_000
+
+# runs the heuristic for one alpha-beta pair and, if n choose m is small enough, the exhaustive search,
+# and reports the gap between the two
+def heuristic_quality_report(perf, dist, change, m, alpha, beta, perf_cutoff, restarts=ANNEALING_RESTARTS, max_workers=1, seed=0):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    cost = numpy_cost_matrix(get_cost_matrix(perf, dist, change, alpha, beta, perf_cutoff))
+    start_time = time.time()
+    candidates = heuristic_subset_search(cost, m, restarts=restarts, max_workers=max_workers, seed=seed)
+    report = dict(heuristic_val=np.inf, heuristic_members=[], heuristic_time=time.time()-start_time,
+                  optimal_val=np.nan, optimal_members=[], gap=np.nan, relative_gap=np.nan)
+    if len(candidates) > 0:
+        report['heuristic_val'] = candidates[0][0]
+        report['heuristic_members'] = [members[i] for i in candidates[0][2]]
+
+    total_combinations = n_combinations(len(members), m)
+    if total_combinations <= HEURISTIC_REPORT_LIMIT:
+        exact = numpy_combination_search(cost, members, m, 1, True, time.time())
+        if len(exact) > 0:
+            report['optimal_val'] = exact[0][0]
+            report['optimal_members'] = [members[i] for i in exact[0][2]]
+            report['gap'] = report['heuristic_val'] - report['optimal_val']
+            report['relative_gap'] = report['gap'] / abs(report['optimal_val'])
+
+    print(f"heuristic: {report['heuristic_val']:.4f} in {report['heuristic_time']:.1f} s")
+    if np.isnan(report['gap']):
+        print(f"{total_combinations} combinations, too many to compute the exhaustive optimum")
+    else:
+        print(f"optimum:   {report['optimal_val']:.4f}, gap {report['gap']:.4f} ({100*report['relative_gap']:.2f}%)")
+    return report
+
+# a swap has to improve the cost by more than this for a member to count as dominated (rounding)
+DOMINANCE_TOLERANCE = 1e-9
+
+# members that can be in one of the k best subsets, as sorted indices into the cost matrix.
+# j dominates i if swapping i for j lowers the cost of every subset containing i but not j,
+# i.e. if c_jj - c_ii plus the m-1 largest p_jl - p_il (l != i, j) is negative.
+# a subset containing a member dominated by m+k-1 others has at least k strictly better subsets,
+# such members are removed (repeatedly, as fewer members leave fewer subsets to consider)
+def dominance_filter(cost, m, k=1):
+    diag_all, pair_all = heuristic_matrices(cost)
+    keep = np.arange(len(cost))
+    while len(keep) > m:
+        n = len(keep)
+        diag, pair = diag_all[keep], pair_all[np.ix_(keep, keep)]
+        dominators = np.zeros(n, dtype=int)
+        for i in range(n):
+            gain = pair - pair[i]
+            gain[:, i] = -np.inf
+            np.fill_diagonal(gain, -np.inf)
+            worst = np.partition(gain, n-m+1, axis=1)[:, n-m+1:].sum(axis=1) if m > 1 else 0.
+            delta = diag - diag[i] + worst
+            delta[i] = np.inf
+            dominators[i] = np.count_nonzero(delta < -DOMINANCE_TOLERANCE)
+        dominated = dominators >= m + k - 1
+        if not dominated.any():
+            break
+        keep = keep[~dominated]
+    return keep
+
+# cost matrix of the members below the performance cutoff for a given alpha and beta
+def get_cost_matrix(perf, dist, change, alpha, beta, perf_cutoff):
+    norm_perf, norm_dist, norm_change = cached_norm_matrices(perf, dist, change, perf_cutoff)
+    return (1-alpha-beta) * norm_perf - alpha * norm_dist - beta * norm_change
+
+# solvers of search_subsets
+SOLVERS = ('numpy', 'xarray', 'branch_and_bound', 'revolving_door', 'numba', 'milp', 'heuristic')
+# solvers that score every combination
+EXHAUSTIVE_SOLVERS = ('numpy', 'xarray', 'revolving_door', 'numba')
+
+# the k lowest-cost (cost, rank, combo) from best to worst, found with the chosen solver.
+# solver statistics are added to stats (see add_stats)
+def search_subsets(cost_matrix, members, m, k, silent=True, solver='numpy', shard_workers=1, prefilter=False, incumbents=(), checkpoint=None, stats=None):
+    if prefilter:
+        keep = dominance_filter(numpy_cost_matrix(cost_matrix), m, k)
+        add_stats(stats, prefilter_members=len(members), prefilter_kept=len(keep))
+        if not silent:
+            before, after = n_combinations(len(members), m), n_combinations(len(keep), m)
+            print(f"dominance pre-filter: {len(members)} -> {len(keep)} members, {before} -> {after} combinations ({before/max(after, 1):.1f}x fewer)")
+        if len(keep) < len(members):
+            position = {int(i): j for j, i in enumerate(keep)}
+            incumbents = [[position[i] for i in combo] for combo in incumbents if all(i in position for i in combo)]
+            candidates = search_subsets(cost_matrix.isel(member=keep, member_model=keep), [members[i] for i in keep], m, k, silent=silent, solver=solver, shard_workers=shard_workers, incumbents=incumbents, checkpoint=checkpoint, stats=stats)
+            return [(val, rank, tuple(int(keep[i]) for i in combo)) for val, rank, combo in candidates]
+
+    # now we check for all combinations (n choose m) many, or prune them (branch_and_bound)
+    total_combinations = n_combinations(len(members), m)
+    start_time = time.time()
+    if checkpoint is not None and (solver != 'numpy' or shard_workers > 1):
+        raise ValueError(f"checkpoints are saved by solver 'numpy' with shard_workers=1 only, not {solver!r} with shard_workers={shard_workers}")
+    # statistics of this search, also needed for the report when stats is None
+    counts = {}
+
+    if shard_workers > 1 and solver == 'heuristic':
+        # the heuristic runs its restarts on the shard workers
+        candidates = heuristic_combination_search(cost_matrix, members, m, k, silent, start_time, shard_workers, counts)
+    elif shard_workers > 1:
+        if solver != 'numpy':
+            raise ValueError(f"shard_workers={shard_workers} requires solver 'numpy' or 'heuristic', not {solver!r}")
+        candidates = sharded_combination_search(cost_matrix, members, m, k, silent, start_time, shard_workers)
+    elif solver == 'xarray':
+        candidates = xarray_combination_search(cost_matrix, members, m, k, silent, start_time)
+    elif solver == 'numpy':
+        candidates = numpy_combination_search(cost_matrix, members, m, k, silent, start_time, checkpoint)
+    elif solver == 'branch_and_bound':
+        candidates = branch_and_bound_search(cost_matrix, members, m, k, silent, start_time, incumbents, counts)
+    elif solver == 'revolving_door':
+        candidates = revolving_door_search(cost_matrix, members, m, k, silent, start_time)
+    elif solver == 'numba':
+        candidates = numba_combination_search(cost_matrix, members, m, k, silent, start_time)
+    elif solver == 'milp':
+        candidates = milp_combination_search(cost_matrix, members, m, k, silent, start_time)
+    elif solver == 'heuristic':
+        candidates = heuristic_combination_search(cost_matrix, members, m, k, silent, start_time, stats=counts)
+    else:
+        raise ValueError(f"unknown solver {solver!r}, choose one of {', '.join(SOLVERS)}")
+
+    add_stats(stats, **counts)
+    if not silent:
+        elapsed = f"which took {(time.time() - start_time)/60:.1f} min"
+        if solver in EXHAUSTIVE_SOLVERS:
+            print(f"all {total_combinations} combinations tested, {elapsed}")
+        else:
+            # branch_and_bound scores the leaves it does not prune, milp only the subsets it returns
+            scored = counts.get('leaves', counts.get('visited', len(candidates)))
+            print(f"{scored} of {total_combinations} combinations scored ({solver}), {elapsed}")
+    return candidates
+
+# check all combinations to determine the cost-function-minimizing subset
+def get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=True, min2=False, solver='numpy', shard_workers=1, prefilter=False, incumbents=(), checkpoint=None, stats=None):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    n = len(members)
+    if not silent:
+        print(f'using {n} models with perf < {perf_cutoff}')
+
+    cost_matrix = get_cost_matrix(perf, dist, change, alpha, beta, perf_cutoff)
+    k = 2 if min2 else 1
+    candidates = search_subsets(cost_matrix, members, m, k, silent=silent, solver=solver, shard_workers=shard_workers, prefilter=prefilter, incumbents=member_indices(members, incumbents), checkpoint=checkpoint, stats=stats)
+
+    minX_val, minX_combo = np.inf, []
+    if len(candidates) >= k:
+        minX_val, _, minX_combo = candidates[k-1]
+    minX_members = [members[i] for i in minX_combo]
 
     if not silent:
-        print(f"all {total_combinations} combinations tested, which took {(time.time() - start_time)/60:.1f} min")
         print(f"min val (alpha={alpha}): {minX_val}")
         print(f"min members:")
         for index, member in zip(minX_combo, minX_members):
@@ -418,60 +1531,887 @@ def get_best_m_models(perf, dist, change, m, alpha, beta, perf_cutoff, silent=Tr
             print(f" * {member:>24}   perf: {perf[index].data:>6.2f} dist: {' '.join(distances)} spread: {' '.join(spreads)}") # avr_dist: {avr_dist[index].data:>6.2f}
     return minX_val, minX_members
 
+# the k best subsets as arrays of costs (k,) and members (k, m), ordered from best to worst
+def get_best_k_models(perf, dist, change, m, k, alpha, beta, perf_cutoff, silent=True, solver='numpy', shard_workers=1, prefilter=False, incumbents=(), checkpoint=None, stats=None):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    if not silent:
+        print(f'using {len(members)} models with perf < {perf_cutoff}')
+
+    cost_matrix = get_cost_matrix(perf, dist, change, alpha, beta, perf_cutoff)
+    candidates = search_subsets(cost_matrix, members, m, k, silent=silent, solver=solver, shard_workers=shard_workers, prefilter=prefilter, incumbents=member_indices(members, incumbents), checkpoint=checkpoint, stats=stats)
+    return candidates_to_arrays(candidates, members, m)
+
+# index tuples of the subsets (lists of member names) whose members are all in members
+def member_indices(members, subsets):
+    position = {member: i for i, member in enumerate(members)}
+    return [tuple(position[member] for member in subset) for subset in subsets if len(subset) > 0 and all(member in position for member in subset)]
+
+# costs (k,) and member names (k, m) of sorted candidates
+def candidates_to_arrays(candidates, members, m):
+    vals = np.array([float(c[0]) for c in candidates], dtype=np.float64)
+    subsets = np.array([[str(members[i]) for i in c[2]] for c in candidates], dtype=object).reshape(len(candidates), m)
+    return vals, subsets
+
 # creates csv in parallel (when multiple cores are available)
-def multi_parallel_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, max_workers, min2=False):
+# with shared_data, the normalized metrics are published once (in shared memory if available) instead of
+# sending data with every alpha-beta pair.
+# the cells are collected as one csv file per cell under single_run_res (result_store='files') or in a
+# sqlite result store (result_store='sqlite'); in both cases a restarted run only solves the missing cells
+def multi_parallel_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, max_workers, min2=False, solver='numpy', top_k=None, shard_workers=1, prefilter=False, shared_data=False, result_store='files', cache=None):
     print(f'running with {max_workers} workers.')
+    if top_k and min2:
+        raise ValueError('min2 and top_k cannot be combined, min2 is the second subset of top_k=2')
     min2_text=""
     if min2:
         min2_text='min2_'
+    if top_k:
+        min2_text=f'top{top_k}_'
     single_run_subdir = cmip+'_'+season_region+'_'+min2_text+im_or_em
-    filename=Path(cmip+'_'+im_or_em+'_'+season_region+'_'+min2_text+'alpha-beta-scan.csv')
+    filename=scan_filename(cmip, im_or_em, season_region, min2, top_k)
     if filename.exists():
         raise RuntimeError('file exists!')
 
-    single_run_res = filename.parent / "single_run_res"
+    grid = alpha_beta_grid(alpha_steps, beta_steps)
+    if result_store == 'sqlite':
+        store = filename.parent / "single_run_res.sqlite"
+        done = stored_cells(store, single_run_subdir, m)
+    elif result_store == 'files':
+        single_run_res = filename.parent / "single_run_res"
+    else:
+        raise ValueError(f"unknown result_store {result_store!r}, choose 'files' or 'sqlite'")
     futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as pool:
-        for alpha_idx in range(0,alpha_steps+1):
-            for beta_idx in range(0,beta_steps+1):
-                alpha = alpha_idx/alpha_steps
-                beta = beta_idx/beta_steps
-                if alpha + beta > 1:
-                    continue
-                single_run_file = single_run_res / single_run_subdir / str(m) / str(alpha) / f'{beta}.csv'
-                single_run_file.parent.mkdir(parents=True, exist_ok=True)
-                if single_run_file.exists():
-                    continue
-                future = pool.submit(single_run_with_save, single_run_file, m, alpha, beta, perf_cutoff, data, silent=True, min2=min2)
-                futures.append(future)
-                print(f'submitted {alpha_idx}/{beta_idx}')
+    shm, pool_kwargs = None, {}
+    if shared_data:
+        digest = metrics_digest(*get_metrics(data))
+        norm_perf, norm_dist, norm_change = cached_norm_matrices(*get_metrics(data), perf_cutoff)
+        members = [str(member) for member in norm_perf.member.data]
+        norm = np.stack([norm_perf.data, norm_dist.data, norm_change.data])
+        if shared_memory is not None:
+            shm = publish_shared_metrics(norm)
+            pool_kwargs = dict(initializer=attach_shared_metrics, initargs=(members, norm.shape, shm.name))
+        else:
+            pool_kwargs = dict(initializer=attach_shared_metrics, initargs=(members, norm.shape, None, norm))
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, **pool_kwargs) as pool:
+            for alpha, beta in grid:
+                if result_store == 'sqlite':
+                    if (alpha, beta) in done:
+                        continue
+                    target, store_scan = store, single_run_subdir
+                else:
+                    single_run_file = single_run_res / single_run_subdir / str(m) / str(alpha) / f'{beta}.csv'
+                    single_run_file.parent.mkdir(parents=True, exist_ok=True)
+                    if single_run_file.exists():
+                        continue
+                    target, store_scan = single_run_file, None
+                if shared_data:
+                    cache_key = result_cache_key(digest, m, alpha, beta, perf_cutoff, solver, min2, top_k, prefilter)
+                    future = pool.submit(shared_single_run_with_save, target, m, alpha, beta, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, store_scan=store_scan, cache=cache, cache_key=cache_key)
+                else:
+                    future = pool.submit(single_run_with_save, target, m, alpha, beta, perf_cutoff, data, silent=True, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, store_scan=store_scan, cache=cache)
+                futures.append(((alpha, beta), future))
+                print(f'submitted {alpha}/{beta}')
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
 
-    for i, future in enumerate(futures):
-        future.result()
+    # the workers return the solver statistics of their cell
+    cell_stats = {}
+    for i, (cell, future) in enumerate(futures):
+        cell_stats[cell] = future.result()
         print('Progress', i, len(futures))
 
-    with open(filename, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['alpha','beta','min_val']+[f'member{i}' for i in range(m)])
-        for alpha_idx in range(0,alpha_steps+1):
-            for beta_idx in range(0,beta_steps+1):
-                alpha = alpha_idx/alpha_steps
-                beta = beta_idx/beta_steps
-                if alpha + beta > 1:
-                    continue
+    if result_store == 'sqlite':
+        export_result_store(store, single_run_subdir, m, grid, filename, top_k)
+    else:
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(scan_header(m, top_k))
+            for alpha, beta in alpha_beta_grid(alpha_steps, beta_steps):
                 single_run_file = single_run_res / single_run_subdir / str(m) / str(alpha) / f'{beta}.csv'
                 with open(single_run_file, 'r') as f2:
                     for row in csv.reader(f2):
                         print(row)
                         writer.writerow(row)
+    report_prefilter(cell_stats)
+    write_scan_stats(filename, cell_stats)
     return filename
 
 # saves as an intermidiate step when running in parallel
-def single_run_with_save(filename, m, alpha, beta, perf_cutoff, data, silent=False, min2=False):
-    min_val, min_member = single_run(m, alpha, beta, perf_cutoff, data, silent=True, min2=min2)
+# (to the result store filename if store_scan is given, see save_cell), returns the solver statistics
+def single_run_with_save(filename, m, alpha, beta, perf_cutoff, data, silent=False, min2=False, solver='numpy', top_k=None, shard_workers=1, prefilter=False, store_scan=None, cache=None):
+    checkpoint = cell_checkpoint(filename, store_scan, m, alpha, beta) if solver == 'numpy' and shard_workers == 1 else None
+    stats = {}
+    min_val, min_member = single_run(m, alpha, beta, perf_cutoff, data, silent=True, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, checkpoint=checkpoint, cache=cache, stats=stats)
+    save_cell(filename, store_scan, m, alpha, beta, min_val, min_member, top_k)
+    return stats
+
+# checkpoint file of a cell of the parallel scan
+def cell_checkpoint(filename, store_scan, m, alpha, beta):
+    if store_scan is None:
+        return Path(str(filename)+'.checkpoint')
+    return Path(f'{filename}.{store_scan}_{m}_{alpha}_{beta}.checkpoint')
+
+# writes the result of one alpha-beta pair to its own csv file, or to the result store
+# filename under the scan name store_scan
+def save_cell(filename, store_scan, m, alpha, beta, min_val, min_member, top_k=None):
+    if store_scan is not None:
+        store_cell(filename, store_scan, m, alpha, beta, min_val, min_member, top_k)
+        return
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(scan_rows(alpha, beta, min_val, min_member, top_k))
+
+##################################################################
+# result store
+##################################################################
+
+# seconds a worker waits for another one to finish writing to the result store
+STORE_TIMEOUT = 600
+
+# connection to the sqlite result store, one row per (scan, m, alpha, beta, rank).
+# with the write-ahead log, workers can add cells while others read the store
+def open_result_store(path):
+    con = sqlite3.connect(str(path), timeout=STORE_TIMEOUT)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('CREATE TABLE IF NOT EXISTS results (scan TEXT, m INTEGER, alpha REAL, beta REAL, rank INTEGER, '
+                'min_val REAL, members TEXT, PRIMARY KEY (scan, m, alpha, beta, rank))')
+    return con
+
+# stores the result of one alpha-beta pair (all top_k subsets at once, in one transaction)
+def store_cell(path, scan, m, alpha, beta, min_val, min_member, top_k=None):
+    subsets = list(zip(min_val, min_member)) if top_k else [(min_val, min_member)]
+    rows = [(scan, m, alpha, beta, rank, float(val), json.dumps([str(member) for member in subset]))
+            for rank, (val, subset) in enumerate(subsets)]
+    con = open_result_store(path)
+    try:
+        with con:
+            con.execute('DELETE FROM results WHERE scan=? AND m=? AND alpha=? AND beta=?', (scan, m, alpha, beta))
+            con.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+    finally:
+        con.close()
+
+# (alpha, beta) pairs of a scan already in the store
+def stored_cells(path, scan, m):
+    if not Path(path).exists():
+        return set()
+    con = open_result_store(path)
+    try:
+        return set(con.execute('SELECT DISTINCT alpha, beta FROM results WHERE scan=? AND m=?', (scan, m)))
+    finally:
+        con.close()
+
+# (alpha, beta) pairs of the grid that are not in the store yet
+def missing_cells(path, scan, m, grid):
+    done = stored_cells(path, scan, m)
+    return [(alpha, beta) for alpha, beta in grid if (alpha, beta) not in done]
+
+# writes the stored cells of the grid as the csv of the alpha-beta scan
+def export_result_store(path, scan, m, grid, filename, top_k=None):
+    missing = missing_cells(path, scan, m, grid)
+    if len(missing) > 0:
+        raise RuntimeError(f'{len(missing)} alpha-beta pairs of {scan} (m={m}) are not in {path}')
+    con = open_result_store(path)
+    cells = {}
+    try:
+        query = 'SELECT alpha, beta, min_val, members FROM results WHERE scan=? AND m=? ORDER BY rank'
+        for alpha, beta, min_val, members in con.execute(query, (scan, m)):
+            cells.setdefault((alpha, beta), []).append((min_val, json.loads(members)))
+    finally:
+        con.close()
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(scan_header(m, top_k))
+        for alpha, beta in grid:
+            vals, subsets = zip(*cells[(alpha, beta)])
+            if top_k:
+                writer.writerows(scan_rows(alpha, beta, vals, subsets, top_k))
+            else:
+                writer.writerows(scan_rows(alpha, beta, vals[0], subsets[0]))
+    return filename
+
+##################################################################
+# result cache
+##################################################################
+
+# upper limit of the stored results in bytes, the least recently used results are evicted beyond it
+RESULT_CACHE_BYTES = 256 * 2**20
+
+# connection to the sqlite result cache, one row per result of an alpha-beta pair.
+# unlike the result store, the cache is content-addressed and can be shared by all scans and notebooks
+def open_result_cache(path):
+    con = sqlite3.connect(str(path), timeout=STORE_TIMEOUT)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, result TEXT, last_used REAL)')
+    return con
+
+# key of the result of one alpha-beta pair, digest is the metrics_digest of the data
+# (shard_workers and warm starts do not change the result and are not part of the key)
+def result_cache_key(digest, m, alpha, beta, perf_cutoff, solver, min2=False, top_k=None, prefilter=False):
+    settings = (digest, m, float(alpha), float(beta), float(perf_cutoff), solver, bool(min2), top_k or 0, bool(prefilter))
+    return hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+
+# cached (min_val, min_member) of a key, as returned by single_run, or None
+def cache_get(path, key, m, top_k=None):
+    con = open_result_cache(path)
+    try:
+        with con:
+            row = con.execute('SELECT result FROM cache WHERE key=?', (key,)).fetchone()
+            if row is None:
+                return None
+            con.execute('UPDATE cache SET last_used=? WHERE key=?', (time.time(), key))
+    finally:
+        con.close()
+    min_val, min_member = json.loads(row[0])
+    if top_k:
+        return np.array(min_val, dtype=np.float64), np.array(min_member, dtype=object).reshape(len(min_val), m)
+    return min_val, min_member
+
+# stores a result and evicts the least recently used ones beyond max_bytes
+def cache_put(path, key, min_val, min_member, top_k=None, max_bytes=RESULT_CACHE_BYTES):
+    if top_k:
+        result = [[float(val) for val in min_val], [[str(member) for member in subset] for subset in min_member]]
+    else:
+        result = [float(min_val), [str(member) for member in min_member]]
+    con = open_result_cache(path)
+    try:
+        with con:
+            con.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)', (key, json.dumps(result), time.time()))
+            evict_result_cache(con, max_bytes)
+    finally:
+        con.close()
+
+# deletes the least recently used results until the stored results fit into max_bytes
+def evict_result_cache(con, max_bytes=RESULT_CACHE_BYTES):
+    total = con.execute('SELECT COALESCE(SUM(LENGTH(result)), 0) FROM cache').fetchone()[0]
+    if total <= max_bytes:
+        return
+    for key, size in con.execute('SELECT key, LENGTH(result) FROM cache ORDER BY last_used').fetchall():
+        if total <= max_bytes:
+            break
+        con.execute('DELETE FROM cache WHERE key=?', (key,))
+        total -= size
+
+# normalized metrics of the parallel scan in a worker process, set by attach_shared_metrics
+worker_metrics = {}
+
+# copies the stacked normalized metrics (3, n, n) into a new shared memory block
+def publish_shared_metrics(norm):
+    shm = shared_memory.SharedMemory(create=True, size=norm.nbytes)
+    np.ndarray(norm.shape, dtype=np.float64, buffer=shm.buf)[:] = norm
+    return shm
+
+# worker initializer, attaches to the shared memory block by name (or keeps the copy sent once per worker)
+def attach_shared_metrics(members, shape, name, norm=None):
+    if name is not None:
+        shm = shared_memory.SharedMemory(name=name)
+        worker_metrics['shm'] = shm # keeps the buffer alive
+        norm = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    worker_metrics['members'] = members
+    worker_metrics['norm'] = norm
+
+# single_run_with_save on the metrics published to the worker, only alpha and beta are sent per task (returns the solver statistics)
+# with a cache, cache_key is the result_cache_key of the cell (the worker has no data to compute it from)
+def shared_single_run_with_save(filename, m, alpha, beta, min2=False, solver='numpy', top_k=None, shard_workers=1, prefilter=False, store_scan=None, cache=None, cache_key=None):
+    if cache is not None:
+        result = cache_get(cache, cache_key, m, top_k)
+        if result is not None:
+            save_cell(filename, store_scan, m, alpha, beta, *result, top_k)
+            return {}
+    members = worker_metrics['members']
+    norm_perf, norm_dist, norm_change = worker_metrics['norm']
+    cost = (1-alpha-beta) * norm_perf - alpha * norm_dist - beta * norm_change
+    cost_matrix = xr.DataArray(cost, dims=['member','member_model'], coords=dict(member=members, member_model=members))
+    k = top_k if top_k else (2 if min2 else 1)
+    checkpoint = cell_checkpoint(filename, store_scan, m, alpha, beta) if solver == 'numpy' and shard_workers == 1 else None
+    stats = {}
+    candidates = search_subsets(cost_matrix, members, m, k, solver=solver, shard_workers=shard_workers, prefilter=prefilter, checkpoint=checkpoint, stats=stats)
+    if top_k:
+        min_val, min_member = candidates_to_arrays(candidates, members, m)
+    elif len(candidates) >= k:
+        min_val, _, min_combo = candidates[k-1]
+        min_member = [members[i] for i in min_combo]
+    else:
+        min_val, min_member = np.inf, []
+    if cache is not None:
+        cache_put(cache, cache_key, min_val, min_member, top_k)
+    save_cell(filename, store_scan, m, alpha, beta, min_val, min_member, top_k)
+    return stats
+
+##################################################################
+# single-pass alpha-beta scan
+##################################################################
+
+# number of grid cells updated at once per chunk of combinations
+SCAN_CELL_BLOCK = 128
+
+# normalized performance, distance and change as float64 arrays
+# elements that are nan in any of the three are dropped from all (as in the xarray sum of the cost matrix)
+def cost_components(perf, dist, change, perf_cutoff):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    norm_perf, norm_dist, norm_change = cached_norm_matrices(perf, dist, change, perf_cutoff)
+    components = np.stack([norm_perf.data, -norm_dist.data, -norm_change.data]).astype(np.float64)
+    components[:, np.isnan(components).any(axis=0)] = 0.
+    return members, components
+
+# per-subset sums of the three cost components, shape (3, len(combos))
+def component_sums(components, combos):
+    return np.stack([combination_costs(c, combos) for c in components])
+
+# weights of the three components for each (alpha, beta)
+def component_weights(grid):
+    return np.array([[1-alpha-beta, alpha, beta] for alpha, beta in grid], dtype=np.float64)
+
+# no candidates yet for ncells cells: costs, ranks and combinations
+def empty_scan_candidates(ncells, k, m):
+    return (np.full((ncells, k), np.inf), np.full((ncells, k), np.iinfo(np.int64).max, dtype=np.int64),
+            np.zeros((ncells, k, m), dtype=np.intp))
+
+# merges the k lowest candidates of a new chunk into the running ones, cell by cell
+# candidates are ordered by (cost, rank), so earlier combinations win ties
+def merge_scan_candidates(best, new, k):
+    vals, ranks, combos = [np.concatenate([b, c], axis=1) for b, c in zip(best, new)]
+    order = np.lexsort((ranks, vals), axis=1)[:, :k]
+    return (np.take_along_axis(vals, order, axis=1), np.take_along_axis(ranks, order, axis=1),
+            np.take_along_axis(combos, order[:, :, None], axis=1))
+
+# enumerates all combinations once and returns the k best subsets for every cell of the grid,
+# as arrays of costs (k,) and members (k, m) ordered from best to worst
+def scan_best_k_models(perf, dist, change, m, k, grid, perf_cutoff, silent=True):
+    members, components = cost_components(perf, dist, change, perf_cutoff)
+    n = len(members)
+    if not silent:
+        print(f'using {n} models with perf < {perf_cutoff}, scanning {len(grid)} alpha-beta pairs')
+    weights = component_weights(grid)
+    ncells = len(grid)
+
+    best = empty_scan_candidates(ncells, k, m)
+    total_combinations = n_combinations(n, m)
+    start_time = time.time()
+    offset = 0
+    for combos in combination_chunks(n, m):
+        sums = component_sums(components, combos)
+        update_scan_candidates(best, weights, sums, combos, offset + np.arange(len(combos)), k)
+        offset += len(combos)
+        if not silent:
+            percent = offset / total_combinations
+            print(f"{100*percent:>4.1f}% after {(time.time() - start_time)/60:.1f} min")
+
+    if not silent:
+        print(f"all {total_combinations} combinations tested, which took {(time.time() - start_time)/60:.1f} min")
+    return scan_results(best, members, m)
+
+# merges the k best combinations of a chunk (with lexicographic ranks) into the running candidates best of every cell (in place)
+def update_scan_candidates(best, weights, sums, combos, ranks, k):
+    kk = min(k, len(combos))
+    for start in range(0, len(weights), SCAN_CELL_BLOCK):
+        cells = slice(start, start+SCAN_CELL_BLOCK)
+        costs = weights[cells] @ sums
+        rows = np.arange(costs.shape[0])
+        new_vals, new_idx = np.empty((len(rows), kk)), np.empty((len(rows), kk), dtype=np.int64)
+        for i in range(kk):
+            # repeated argmin keeps the first of equal costs
+            j = np.argmin(costs, axis=1)
+            new_vals[:, i], new_idx[:, i] = costs[rows, j], j
+            costs[rows, j] = np.inf
+        merged = merge_scan_candidates(tuple(b[cells] for b in best), (new_vals, ranks[new_idx], combos[new_idx]), k)
+        for b, r in zip(best, merged):
+            b[cells] = r
+
+# the candidates of every cell as arrays of costs (k,) and members (k, m), see candidates_to_arrays
+def scan_results(best, members, m):
+    results = []
+    for vals, ranks, combos in zip(*best):
+        found = np.isfinite(vals)
+        candidates = list(zip(vals[found], ranks[found], [tuple(c) for c in combos[found].tolist()]))
+        results.append(candidates_to_arrays(candidates, members, m))
+    return results
+
+# enumerates all combinations once and returns the minimum (or runner-up) for every cell of the grid
+def scan_best_m_models(perf, dist, change, m, grid, perf_cutoff, silent=True, min2=False):
+    k = 2 if min2 else 1
+    results = []
+    for vals, subsets in scan_best_k_models(perf, dist, change, m, k, grid, perf_cutoff, silent=silent):
+        if len(vals) < k:
+            results.append((np.inf, []))
+        else:
+            results.append((vals[k-1], list(subsets[k-1])))
+    return results
+
+# create csv with minimizing value and subset listed for each alpha-beta combo, enumerating the combinations only once
+def multi_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=False, top_k=None):
+    filename=scan_filename(cmip, im_or_em, season_region, min2, top_k)
+    if filename.exists():
+        raise RuntimeError('file exists!')
+    grid = alpha_beta_grid(alpha_steps, beta_steps)
+    perf, dist, change = get_metrics(data)
+    if top_k:
+        results = scan_best_k_models(perf, dist, change, m, top_k, grid, perf_cutoff, silent=False)
+    else:
+        results = scan_best_m_models(perf, dist, change, m, grid, perf_cutoff, silent=False, min2=min2)
     with open(filename, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow([alpha,beta,min_val]+min_member)
+        writer.writerow(scan_header(m, top_k))
+        for (alpha, beta), (min_val, min_member) in zip(grid, results):
+            print(alpha, beta, min_val, min_member)
+            writer.writerows(scan_rows(alpha, beta, min_val, min_member, top_k))
+    return filename
+
+##################################################################
+# perf_cutoff sweep
+##################################################################
+
+# perf_cutoffs as a list, a single cutoff is a sweep over one threshold
+def cutoff_list(perf_cutoffs):
+    if np.ndim(perf_cutoffs) == 0:
+        return [perf_cutoffs]
+    return list(perf_cutoffs)
+
+# name of the csv of the alpha-beta scan of one perf_cutoff of a sweep
+def cutoff_scan_filename(cmip, im_or_em, season_region, perf_cutoff, min2=False, top_k=None):
+    filename = scan_filename(cmip, im_or_em, season_region, min2, top_k)
+    return Path(str(filename).replace('alpha-beta-scan', f'cutoff{perf_cutoff}_alpha-beta-scan'))
+
+# raw sums of the cost components that do not depend on the perf_cutoff, shape (4, n, n):
+# performance on the diagonal, distance and change, and the count of elements that are not nan in either
+# (the same elements are dropped as in cost_components)
+def raw_cost_components(perf, dist, change, members):
+    rows, cols = dist.indexes['member'].get_indexer(members), dist.indexes['member_model'].get_indexer(members)
+    dist_data = np.asarray(dist.data, dtype=np.float64)[np.ix_(rows, cols)]
+    rows, cols = change.indexes['member'].get_indexer(members), change.indexes['member_model'].get_indexer(members)
+    change_data = np.asarray(change.data, dtype=np.float64)[np.ix_(rows, cols)]
+    valid = ~np.isnan(dist_data) & ~np.isnan(change_data) & ~np.eye(len(members), dtype=bool)
+    perf_data = np.asarray(perf.sel(member=members).data, dtype=np.float64)
+    return np.stack([np.diag(perf_data), np.where(valid, dist_data, 0.), np.where(valid, change_data, 0.), valid.astype(np.float64)])
+
+# normalization of one perf_cutoff as a linear map of the raw sums: the component sums of a subset (see component_sums)
+# are linear @ raw_sums + offset, with the means and standard deviations of norm_matrices over the admitted members
+def cutoff_normalization(perf, dist, change, members, perf_cutoff, m):
+    keep = [member for member in members if perf.sel(member=member).data < perf_cutoff]
+    perf_data = np.asarray(perf.sel(member=keep).data, dtype=np.float64)
+    dist_data = np.asarray(dist.sel(member=keep, member_model=keep).data, dtype=np.float64)
+    change_data = np.asarray(change.sel(member=keep, member_model=keep).data, dtype=np.float64)
+    mean_perf, std_perf = np.nanmean(perf_data), np.nanstd(perf_data)
+    mean_dist, std_dist = np.nanmean(dist_data), 2*np.nanstd(dist_data) # /2 is due to double count ij, ji
+    mean_change, std_change = np.nanmean(change_data), 2*np.nanstd(change_data)
+    linear = np.array([[1/std_perf, 0., 0., 0.],
+                       [0., -1/std_dist, 0., mean_dist/std_dist],
+                       [0., 0., -1/std_change, mean_change/std_change]])
+    offset = np.array([-m*mean_perf/std_perf, 0., 0.])
+    return len(keep), linear, offset
+
+# enumerates the combinations of the members below the largest cutoff once and returns the k best subsets
+# for every cell of the grid and every perf_cutoff ({perf_cutoff: results as in scan_best_k_models}).
+# with the members sorted by performance, a subset is admitted by all cutoffs above its worst member, which
+# only admits the first n_t members of a cutoff t; its costs follow from the raw sums of the components
+def cutoff_sweep_best_k_models(perf, dist, change, m, k, grid, perf_cutoffs, silent=True):
+    perf_cutoffs = sorted(set(cutoff_list(perf_cutoffs)))
+    members = list(perf.where(perf<perf_cutoffs[-1], drop=True).member.data)
+    n = len(members)
+    raw = raw_cost_components(perf, dist, change, members)
+    # position of each member in the order of increasing performance metric
+    position = np.empty(n, dtype=np.intp)
+    position[np.argsort(np.diag(raw[0]), kind='stable')] = np.arange(n)
+    normalizations = [cutoff_normalization(perf, dist, change, members, perf_cutoff, m) for perf_cutoff in perf_cutoffs]
+    if not silent:
+        for perf_cutoff, (n_admitted, _, _) in zip(perf_cutoffs, normalizations):
+            print(f'using {n_admitted} models with perf < {perf_cutoff}')
+        print(f'scanning {len(grid)} alpha-beta pairs for {len(perf_cutoffs)} cutoffs')
+    weights = component_weights(grid)
+    best = {perf_cutoff: empty_scan_candidates(len(grid), k, m) for perf_cutoff in perf_cutoffs}
+
+    total_combinations = n_combinations(n, m)
+    start_time = time.time()
+    offset = 0
+    for combos in combination_chunks(n, m):
+        raw_sums = component_sums(raw, combos)
+        ranks = offset + np.arange(len(combos))
+        worst = position[combos].max(axis=1)
+        for perf_cutoff, (n_admitted, linear, shift) in zip(perf_cutoffs, normalizations):
+            admissible = worst < n_admitted
+            if admissible.any():
+                sums = linear @ raw_sums[:, admissible] + shift[:, None]
+                update_scan_candidates(best[perf_cutoff], weights, sums, combos[admissible], ranks[admissible], k)
+        offset += len(combos)
+        if not silent:
+            percent = offset / total_combinations
+            print(f"{100*percent:>4.1f}% after {(time.time() - start_time)/60:.1f} min")
+
+    if not silent:
+        print(f"all {total_combinations} combinations tested, which took {(time.time() - start_time)/60:.1f} min")
+    return {perf_cutoff: scan_results(best[perf_cutoff], members, m) for perf_cutoff in perf_cutoffs}
+
+# create one csv per perf_cutoff with minimizing value and subset listed for each alpha-beta combo,
+# enumerating the combinations only once for all cutoffs
+def cutoff_sweep_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoffs, data, min2=False, top_k=None):
+    perf_cutoffs = cutoff_list(perf_cutoffs)
+    if top_k and min2:
+        raise ValueError('min2 and top_k cannot be combined, min2 is the second subset of top_k=2')
+    filenames = [cutoff_scan_filename(cmip, im_or_em, season_region, perf_cutoff, min2, top_k) for perf_cutoff in perf_cutoffs]
+    for filename in filenames:
+        if filename.exists():
+            raise RuntimeError('file exists!')
+    grid = alpha_beta_grid(alpha_steps, beta_steps)
+    k = top_k if top_k else (2 if min2 else 1)
+    results = cutoff_sweep_best_k_models(*get_metrics(data), m, k, grid, perf_cutoffs, silent=False)
+    for perf_cutoff, filename in zip(perf_cutoffs, filenames):
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(scan_header(m, top_k))
+            for (alpha, beta), (vals, subsets) in zip(grid, results[perf_cutoff]):
+                if top_k:
+                    min_val, min_member = vals, subsets
+                elif len(vals) < k:
+                    min_val, min_member = np.inf, []
+                else:
+                    min_val, min_member = vals[k-1], list(subsets[k-1])
+                writer.writerows(scan_rows(alpha, beta, min_val, min_member, top_k))
+    return filenames
+
+##################################################################
+# exact alpha-beta region map
+##################################################################
+
+# relative cost improvement for a subset to be added to the envelope, and smallest region area kept (rounding)
+REGION_TOLERANCE = 1e-9
+# corners of the alpha-beta simplex: performance only, independence only, spread only
+SIMPLEX_CORNERS = [(0., 0.), (1., 0.), (0., 1.)]
+
+# name of the csv holding the region table
+def region_filename(cmip, im_or_em, season_region):
+    return Path(cmip+'_'+im_or_em+'_'+season_region+'_alpha-beta-regions.csv')
+
+# cost of subsets with component sums planes (K, 3) at (alpha, beta)
+def plane_costs(planes, alpha, beta):
+    return np.asarray(planes) @ np.array([1-alpha-beta, alpha, beta])
+
+# part of a convex polygon [(alpha, beta), ...] where c0 + c1*alpha + c2*beta <= 0
+def clip_polygon(polygon, c0, c1, c2):
+    clipped = []
+    values = [c0 + c1*alpha + c2*beta for alpha, beta in polygon]
+    for i, (point, value) in enumerate(zip(polygon, values)):
+        next_point, next_value = polygon[(i+1) % len(polygon)], values[(i+1) % len(polygon)]
+        if value <= 0:
+            clipped.append(point)
+        if (value < 0 < next_value) or (next_value < 0 < value):
+            t = value / (value - next_value)
+            clipped.append((point[0] + t*(next_point[0]-point[0]), point[1] + t*(next_point[1]-point[1])))
+    return clipped
+
+# area of a polygon (shoelace formula)
+def polygon_area(polygon):
+    alpha, beta = np.array(polygon).T
+    return abs(np.dot(alpha, np.roll(beta, -1)) - np.dot(beta, np.roll(alpha, -1))) / 2
+
+# region of the simplex where each plane is the lowest, as a polygon (empty if it is nowhere the lowest)
+def envelope_regions(planes):
+    planes = np.asarray(planes)
+    # cost = X0 + alpha*(X1-X0) + beta*(X2-X0)
+    coefs = np.stack([planes[:, 0], planes[:, 1]-planes[:, 0], planes[:, 2]-planes[:, 0]], axis=1)
+    regions = []
+    for i in range(len(coefs)):
+        polygon = list(SIMPLEX_CORNERS)
+        for j in range(len(coefs)):
+            if j == i:
+                continue
+            polygon = clip_polygon(polygon, *(coefs[i] - coefs[j]))
+            if len(polygon) < 3:
+                break
+        regions.append(polygon if len(polygon) >= 3 and polygon_area(polygon) > REGION_TOLERANCE else [])
+    return regions
+
+# exact map of the optimal subset over the alpha-beta simplex, as the lower envelope of the subset cost planes.
+# the exact search is run at the vertices of the current envelope until it finds no lower subset at any of them;
+# the true envelope is concave, so it then equals the current envelope everywhere.
+# returns the members, the subsets (index tuples), their component sums (K, 3) and regions (polygons).
+# the solver statistics of the checked vertices are added to stats[(alpha, beta)] (see add_stats)
+def get_region_map(perf, dist, change, m, perf_cutoff, silent=True, solver='numpy', prefilter=False, stats=None):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    norm_perf, norm_dist, norm_change = cached_norm_matrices(perf, dist, change, perf_cutoff)
+    _, components = cost_components(perf, dist, change, perf_cutoff)
+    subsets, planes, checked = [], [], set()
+
+    def check_vertex(alpha, beta):
+        cost_matrix = (1-alpha-beta) * norm_perf - alpha * norm_dist - beta * norm_change
+        candidates = search_subsets(cost_matrix, members, m, 1, solver=solver, prefilter=prefilter,
+                                    stats=None if stats is None else stats.setdefault((alpha, beta), {}))
+        if len(candidates) == 0:
+            return False
+        combo = tuple(int(i) for i in candidates[0][2])
+        sums = component_sums(components, np.array([combo], dtype=np.intp))[:, 0]
+        if len(planes) > 0:
+            envelope = plane_costs(planes, alpha, beta).min()
+            if combo in subsets or plane_costs([sums], alpha, beta)[0] >= envelope - REGION_TOLERANCE*max(1., abs(envelope)):
+                return False
+        subsets.append(combo)
+        planes.append(sums)
+        return True
+
+    vertices = list(SIMPLEX_CORNERS)
+    while len(vertices) > 0:
+        for alpha, beta in vertices:
+            checked.add((round(alpha, 12), round(beta, 12)))
+            check_vertex(alpha, beta)
+        regions = envelope_regions(planes)
+        vertices = list({(round(alpha, 12), round(beta, 12)) for polygon in regions for alpha, beta in polygon} - checked)
+        if not silent:
+            print(f"{len(subsets)} subsets, {len(vertices)} vertices left to check")
+
+    keep = [i for i, polygon in enumerate(regions) if len(polygon) > 0]
+    return members, [subsets[i] for i in keep], np.array([planes[i] for i in keep]).reshape(len(keep), 3), [regions[i] for i in keep]
+
+# csv header of the region table: cost of the subset at the three corners of the simplex
+# (the cost at (alpha, beta) is (1-alpha-beta)*cost_perf + alpha*cost_dist + beta*cost_change),
+# the region polygon as "alpha beta;alpha beta;..." and the members
+def region_header(m):
+    return ['region','cost_perf','cost_dist','cost_change','vertices']+[f'member{i}' for i in range(m)]
+
+# create csv with the exact region of the simplex in which each subset is optimal
+def region_map_run(m, cmip, im_or_em, season_region, perf_cutoff, data, solver='numpy', prefilter=False):
+    filename = region_filename(cmip, im_or_em, season_region)
+    if filename.exists():
+        raise RuntimeError('file exists!')
+    perf, dist, change = get_metrics(data)
+    cell_stats = {}
+    members, subsets, planes, regions = get_region_map(perf, dist, change, m, perf_cutoff, silent=False, solver=solver, prefilter=prefilter, stats=cell_stats)
+    report_prefilter(cell_stats)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(region_header(m))
+        for region, (combo, plane, polygon) in enumerate(zip(subsets, planes, regions)):
+            vertices = ';'.join(f'{float(alpha)!r} {float(beta)!r}' for alpha, beta in polygon)
+            print(region, [str(members[i]) for i in combo], f'area {polygon_area(polygon):.4f}')
+            writer.writerow([region]+list(plane)+[vertices]+[members[i] for i in combo])
+    write_scan_stats(filename, cell_stats)
+    return filename
+
+##################################################################
+# adaptive alpha-beta scan
+##################################################################
+
+# lattice points (alpha_idx, beta_idx) of the triangle with corner (a, b) and size h, pointing up
+# (corners (a, b), (a+h, b), (a, b+h)) or down (corners (a+h, b), (a, b+h), (a+h, b+h))
+def triangle_points(a, b, h, up):
+    if up:
+        return [(x, y) for x in range(a, a+h+1) for y in range(b, b+h+1-(x-a))]
+    return [(x, y) for x in range(a, a+h+1) for y in range(b+h-(x-a), b+h+1)]
+
+def triangle_corners(a, b, h, up):
+    if up:
+        return [(a, b), (a+h, b), (a, b+h)]
+    return [(a+h, b), (a, b+h), (a+h, b+h)]
+
+# all triangles of size h of the lattice with steps steps per side
+def lattice_triangles(steps, h):
+    for a in range(0, steps-h+1, h):
+        for b in range(0, steps-a-h+1, h):
+            yield a, b, h, True
+            if a + b + 2*h <= steps:
+                yield a, b, h, False
+
+# k best subsets (combos) for every point of the alpha-beta lattice, solving as few points as possible.
+# the region in which a subset (or ordered list of subsets) is optimal is convex, so if the three corners
+# of a triangle agree, so does every point inside it. triangles are refined from the largest power of
+# two down to single steps, and only where their corners disagree.
+# returns the members and a dict (alpha_idx, beta_idx) -> (costs, combos, solved).
+# the solver statistics of the solved points are added to stats[(alpha, beta)] (see add_stats)
+def adaptive_best_k_models(perf, dist, change, m, k, steps, perf_cutoff, silent=True, solver='numpy', prefilter=False, stats=None):
+    members = list(perf.where(perf<perf_cutoff, drop=True).member.data)
+    norm_perf, norm_dist, norm_change = cached_norm_matrices(perf, dist, change, perf_cutoff)
+    _, components = cost_components(perf, dist, change, perf_cutoff)
+    results, solved = {}, set()
+
+    def solve(point):
+        alpha, beta = point[0]/steps, point[1]/steps
+        cost_matrix = (1-alpha-beta) * norm_perf - alpha * norm_dist - beta * norm_change
+        candidates = search_subsets(cost_matrix, members, m, k, solver=solver, prefilter=prefilter,
+                                    stats=None if stats is None else stats.setdefault((alpha, beta), {}))
+        solved.add(point)
+        return tuple(tuple(int(i) for i in c[2]) for c in candidates)
+
+    h = 1
+    while 2*h <= steps:
+        h *= 2
+    while h >= 1:
+        for a, b, size, up in lattice_triangles(steps, h):
+            points = triangle_points(a, b, size, up)
+            if all(p in results for p in points):
+                continue
+            corners = triangle_corners(a, b, size, up)
+            for corner in corners:
+                if corner not in results:
+                    results[corner] = solve(corner)
+            if len(set(results[c] for c in corners)) == 1:
+                for p in points:
+                    results.setdefault(p, results[corners[0]])
+        if not silent:
+            print(f"triangles of {h} steps done, {len(solved)} of {len(results)} points solved")
+        h //= 2
+
+    total = (steps+1)*(steps+2)//2
+    if not silent:
+        print(f"adaptive scan: solved {len(solved)} of {total} alpha-beta pairs ({100*len(solved)/total:.1f}%)")
+    scan = {}
+    for (alpha_idx, beta_idx), combos in results.items():
+        alpha, beta = alpha_idx/steps, beta_idx/steps
+        if len(combos) > 0:
+            costs = np.array([1-alpha-beta, alpha, beta]) @ component_sums(components, np.array(combos, dtype=np.intp))
+        else:
+            costs = np.empty(0)
+        scan[(alpha_idx, beta_idx)] = (costs, combos, (alpha_idx, beta_idx) in solved)
+    return members, scan
+
+# create csv with minimizing value and subset listed for each alpha-beta combo, refining the grid only
+# where the optimal subset changes (same csv as multi_run)
+def adaptive_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=False, solver='numpy', top_k=None, prefilter=False):
+    if alpha_steps != beta_steps:
+        raise ValueError(f'the adaptive scan refines a triangular grid and requires alpha_steps == beta_steps, not {alpha_steps} and {beta_steps}')
+    if top_k and min2:
+        raise ValueError('min2 and top_k cannot be combined, min2 is the second subset of top_k=2')
+    filename=scan_filename(cmip, im_or_em, season_region, min2, top_k)
+    if filename.exists():
+        raise RuntimeError('file exists!')
+    k = top_k if top_k else (2 if min2 else 1)
+    perf, dist, change = get_metrics(data)
+    cell_stats = {}
+    members, scan = adaptive_best_k_models(perf, dist, change, m, k, alpha_steps, perf_cutoff, silent=False, solver=solver, prefilter=prefilter, stats=cell_stats)
+    report_prefilter(cell_stats)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(scan_header(m, top_k))
+        for alpha_idx in range(0, alpha_steps+1):
+            for beta_idx in range(0, alpha_steps+1-alpha_idx):
+                alpha, beta = alpha_idx/alpha_steps, beta_idx/beta_steps
+                costs, combos, _ = scan[(alpha_idx, beta_idx)]
+                subsets = [[members[i] for i in combo] for combo in combos]
+                if top_k:
+                    min_val, min_member = costs, subsets
+                elif len(combos) >= k:
+                    min_val, min_member = costs[k-1], subsets[k-1]
+                else:
+                    min_val, min_member = np.inf, []
+                writer.writerows(scan_rows(alpha, beta, min_val, min_member, top_k))
+    write_scan_stats(filename, cell_stats)
+    return filename
+
+##################################################################
+# pareto archive of subset sums
+##################################################################
+
+# points checked at once when sweeping for the pareto front, and largest front tabulated at once
+PARETO_BLOCK = 256
+PARETO_TABLE_LIMIT = 2048
+
+# True for the points (N, 3) that are weakly dominated (no lower component) by a point of front (F, 3).
+# with the front sorted by its first component only a prefix can dominate a point x; the table holds
+# the lowest third component of each prefix among the points whose second component is <= a threshold
+def weakly_dominated(points, front):
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(front), PARETO_TABLE_LIMIT):
+        part = front[start:start+PARETO_TABLE_LIMIT]
+        part = part[np.argsort(part[:, 0], kind='stable')]
+        second = np.sort(part[:, 1])
+        table = np.full((len(part)+1, len(part)+1), np.inf)
+        table[1:, 1:] = np.minimum.accumulate(np.where(part[:, 1, None] <= second[None, :], part[:, 2, None], np.inf), axis=0)
+        prefix = np.searchsorted(part[:, 0], points[:, 0], side='right')
+        column = np.searchsorted(second, points[:, 1], side='right')
+        dominated |= table[prefix, column] <= points[:, 2]
+    return dominated
+
+# indices of the points not weakly dominated by an earlier point, ascending.
+# in lexicographic order a point can only be dominated by earlier ones (of equal points the first is kept)
+def pareto_front(points):
+    order = np.lexsort(points.T[::-1])
+    kept = np.empty(0, dtype=np.intp)
+    for start in range(0, len(order), PARETO_BLOCK):
+        block = order[start:start+PARETO_BLOCK]
+        block = block[~weakly_dominated(points[block], points[kept])]
+        b = points[block]
+        earlier = np.tri(len(b), k=-1, dtype=bool)
+        dominated = ((b[None, :, :] <= b[:, None, :]).all(axis=2) & earlier).any(axis=1)
+        kept = np.concatenate([kept, block[~dominated]])
+    return np.sort(kept)
+
+# enumerates all combinations once and keeps the subsets on the pareto front of the component sums
+# (perf, -dist, -change), which contains the optimal subset of every alpha-beta pair.
+# the archive stays in combination order, so ties are resolved as in the exhaustive search
+def build_pareto_archive(perf, dist, change, m, perf_cutoff, silent=True):
+    members, components = cost_components(perf, dist, change, perf_cutoff)
+    n = len(members)
+    sums, combos = np.empty((0, 3)), np.empty((0, m), dtype=np.intp)
+    total_combinations = n_combinations(n, m)
+    start_time = time.time()
+    offset = 0
+    for chunk in combination_chunks(n, m):
+        chunk_sums = component_sums(components, chunk).T
+        new = ~weakly_dominated(chunk_sums, sums)
+        points, candidates = np.concatenate([sums, chunk_sums[new]]), np.concatenate([combos, chunk[new]])
+        keep = pareto_front(points)
+        sums, combos = points[keep], candidates[keep]
+        offset += len(chunk)
+        if not silent:
+            print(f"{100*offset/total_combinations:>4.1f}% after {(time.time() - start_time)/60:.1f} min, {len(sums)} subsets in the archive")
+    return members, combos, sums
+
+# name of the netcdf file holding the pareto archive
+def pareto_archive_filename(cmip, im_or_em, season_region, m):
+    return Path(cmip+'_'+im_or_em+'_'+season_region+f'_m{m}_pareto-archive.nc')
+
+# the archive records m, perf_cutoff and the metrics_digest of the data (members and values) it was built from
+def save_pareto_archive(filename, members, combos, sums, m, perf_cutoff, digest=''):
+    subset_members = np.array([[str(members[i]) for i in combo] for combo in combos], dtype=str).reshape(len(combos), m)
+    ds = xr.Dataset(dict(sums=(['subset','component'], sums), members=(['subset','position'], subset_members)),
+                    coords=dict(component=['perf','dist','change']), attrs=dict(m=m, perf_cutoff=perf_cutoff, metrics_digest=digest))
+    ds.to_netcdf(filename)
+
+# True if the archive was built for m, perf_cutoff and the data with the given metrics_digest (None: not checked)
+def pareto_archive_matches(attrs, m=None, perf_cutoff=None, digest=None):
+    return ((m is None or attrs['m'] == m) and (perf_cutoff is None or attrs['perf_cutoff'] == perf_cutoff)
+            and (digest is None or attrs.get('metrics_digest') == digest))
+
+# archive as arrays of component sums (K, 3) and members (K, m), for query_pareto_archive
+def load_pareto_archive(filename, m=None, perf_cutoff=None, digest=None):
+    ds = csdc.open_dataset(filename)
+    if not pareto_archive_matches(ds.attrs, m, perf_cutoff, digest):
+        raise RuntimeError(f"{filename} was built for m={ds.attrs['m']}, perf_cutoff={ds.attrs['perf_cutoff']} "
+                           f"and data {ds.attrs.get('metrics_digest', 'unknown')}")
+    return ds.sums.values, ds.members.values.astype(str)
+
+# optimal subset for any alpha and beta, from the archive alone
+def query_pareto_archive(archive, alpha, beta):
+    sums, subsets = archive
+    if len(sums) == 0:
+        return np.inf, []
+    costs = sums @ np.array([1-alpha-beta, alpha, beta])
+    i = np.argmin(costs)
+    return costs[i], list(subsets[i])
+
+# create csv with minimizing value and subset listed for each alpha-beta combo from the pareto archive
+# (built with a single enumeration, or reused if it already exists)
+def pareto_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data):
+    filename=scan_filename(cmip, im_or_em, season_region)
+    if filename.exists():
+        raise RuntimeError('file exists!')
+    archive_file = pareto_archive_filename(cmip, im_or_em, season_region, m)
+    perf, dist, change = get_metrics(data)
+    digest = metrics_digest(perf, dist, change)
+    if archive_file.exists() and not pareto_archive_matches(csdc.open_dataset(archive_file).attrs, m, perf_cutoff, digest):
+        print(f'{archive_file} was built for other data, m or perf_cutoff, rebuilding it')
+        archive_file.unlink()
+    if not archive_file.exists():
+        members, combos, sums = build_pareto_archive(perf, dist, change, m, perf_cutoff, silent=False)
+        save_pareto_archive(archive_file, members, combos, sums, m, perf_cutoff, digest)
+    archive = load_pareto_archive(archive_file, m, perf_cutoff, digest)
+    print(f'{len(archive[0])} subsets in {archive_file}')
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(scan_header(m))
+        for alpha, beta in alpha_beta_grid(alpha_steps, beta_steps):
+            min_val, min_member = query_pareto_archive(archive, alpha, beta)
+            print(alpha, beta, min_val, min_member)
+            writer.writerows(scan_rows(alpha, beta, min_val, min_member))
+    return filename
 
 # ################################
 # Make output files
@@ -486,9 +2426,40 @@ def make_output_file(dsDeltaQ,ds_spread_metric,targets,dsWi,outfile='perf_ind_sp
     dsWi['pr_change'] = targets[1]
     dsWi.to_netcdf(outfile)
 
-def select_models(outfile, cmip, im_or_em, season_region, m, alpha_steps, beta_steps, perf_cutoff,max_workers=1, min2=False):
-    data = xr.open_dataset(outfile,use_cftime = True)
+# scans of select_models
+SCANS = ('grid', 'single_pass', 'adaptive', 'pareto', 'regions', 'cutoff_sweep')
+
+def select_models(outfile, cmip, im_or_em, season_region, m, alpha_steps, beta_steps, perf_cutoff,max_workers=1, min2=False, solver='numpy', scan='grid', top_k=None, shard_workers=1, prefilter=False, shared_data=False, result_store='files', cache=None):
+    data = csdc.open_dataset(outfile,use_cftime = True)
+    if cache is not None and scan != 'grid':
+        raise ValueError(f"the result cache is only used by scan='grid', not scan='{scan}'")
+    if scan in ('single_pass', 'cutoff_sweep'):
+        # these scans enumerate the combinations once, in this process, without a solver
+        unused = [name for name, value, default in [('solver', solver, 'numpy'), ('prefilter', prefilter, False), ('max_workers', max_workers, 1),
+                                                     ('shard_workers', shard_workers, 1), ('shared_data', shared_data, False), ('result_store', result_store, 'files')]
+                  if value != default]
+        if unused:
+            raise ValueError(f"scan={scan!r} enumerates the combinations once and does not use {', '.join(unused)}, leave them at their defaults")
+    if scan == 'cutoff_sweep':
+        # perf_cutoff is a list of cutoffs, one csv is written for each
+        return cutoff_sweep_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=min2, top_k=top_k)
+    if scan == 'single_pass':
+        return multi_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=min2, top_k=top_k)
+    if scan == 'adaptive':
+        return adaptive_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=min2, solver=solver, top_k=top_k, prefilter=prefilter)
+    if scan == 'pareto':
+        if min2 or top_k:
+            raise ValueError("the pareto archive holds the optimal subset of each alpha-beta pair only, use scan='grid', 'single_pass' or 'adaptive' for min2 or top_k")
+        return pareto_scan_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data)
+    if scan == 'regions':
+        if min2 or top_k:
+            raise ValueError("the region map holds the optimal subset of each alpha-beta pair only, use scan='grid', 'single_pass' or 'adaptive' for min2 or top_k")
+        return region_map_run(m, cmip, im_or_em, season_region, perf_cutoff, data, solver=solver, prefilter=prefilter)
+    if scan != 'grid':
+        raise ValueError(f"unknown scan {scan!r}, choose one of {', '.join(SCANS)}")
+    if max_workers == 1 and (shared_data or result_store != 'files'):
+        raise ValueError('shared_data and result_store are options of the parallel scan, set max_workers > 1')
     if max_workers==1:
-        return multi_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=min2)
+        return multi_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, cache=cache)
     else:
-        return multi_parallel_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, max_workers, min2=min2)
+        return multi_parallel_run(m, cmip, im_or_em, season_region, alpha_steps, beta_steps, perf_cutoff, data, max_workers, min2=min2, solver=solver, top_k=top_k, shard_workers=shard_workers, prefilter=prefilter, shared_data=shared_data, result_store=result_store, cache=cache)
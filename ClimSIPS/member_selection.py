@@ -8,6 +8,8 @@ import matplotlib.pyplot as plt
 
 from functools import reduce
 
+from . import dataset_cache as csdc
+
 #################################
 ## Determining common members
 #################################
@@ -781,24 +783,24 @@ def CMIP6_spread_maximizing_members(CMIP6_common_members,season_region):
 
     if season_region == 'JJA_CEU':
     # select default models
-        dsT6 = xr.open_dataset(path+'tas_CMIP6_SSP585_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT6 = csdc.open_dataset(path+'tas_CMIP6_SSP585_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT6 = dsT6.sel(member=CMIP6_common_members)
 
-        dsPr6 = xr.open_dataset(path+'pr_CMIP6_SSP585_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr6 = csdc.open_dataset(path+'pr_CMIP6_SSP585_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr6 = dsPr6.sel(member=CMIP6_common_members)
 
     if season_region == 'DJF_NEU':
-        dsT6 = xr.open_dataset(path+'tas_CMIP6_SSP585_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT6 = csdc.open_dataset(path+'tas_CMIP6_SSP585_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT6 = dsT6.sel(member=CMIP6_common_members)
 
-        dsPr6 = xr.open_dataset(path+'pr_CMIP6_SSP585_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr6 = csdc.open_dataset(path+'pr_CMIP6_SSP585_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr6 = dsPr6.sel(member=CMIP6_common_members)
 
     if season_region == 'DJF_CEU':
-        dsT6 = xr.open_dataset(path+'tas_CMIP6_SSP585_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT6 = csdc.open_dataset(path+'tas_CMIP6_SSP585_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT6 = dsT6.sel(member=CMIP6_common_members)
 
-        dsPr6 = xr.open_dataset(path+'pr_CMIP6_SSP585_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr6 = csdc.open_dataset(path+'pr_CMIP6_SSP585_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr6 = dsPr6.sel(member=CMIP6_common_members)
 
     targets = [dsT6,dsPr6]
@@ -937,24 +939,24 @@ def CMIP5_spread_maximizing_members(CMIP5_common_members,season_region):
 
     if season_region == 'JJA_CEU':
     # select default models
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_common_members)
 
     if season_region == 'DJF_NEU':
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_common_members)
 
     if season_region == 'DJF_CEU':
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_common_members)
 
     targets = [dsT5,dsPr5]
@@ -1023,24 +1025,24 @@ def CMIP5_RCM_spread_maximizing_members(CMIP5_RCM_common_members,season_region):
 
     if season_region == 'JJA_CEU':
     # select default models
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_RCM_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_CEU_jja_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_RCM_common_members)
 
     if season_region == 'DJF_NEU':
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_RCM_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_NEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_RCM_common_members)
 
     if season_region == 'DJF_CEU':
-        dsT5 = xr.open_dataset(path+'tas_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsT5 = csdc.open_dataset(path+'tas_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsT5 = dsT5.sel(member=CMIP5_RCM_common_members)
 
-        dsPr5 = xr.open_dataset(path+'pr_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
+        dsPr5 = csdc.open_dataset(path+'pr_CMIP5_rcp85_CEU_djf_2041-2060_1995-2014_diff.nc',use_cftime = True)
         dsPr5 = dsPr5.sel(member=CMIP5_RCM_common_members)
 
     targets = [dsT5,dsPr5]
@@ -27,16 +27,38 @@ def shannon_entropy(p):
             continue
     return -1.*s
 
+def region_table_rows(reader,no_of_steps):
+    """Evaluates a region table (scan='regions') on the ternary grid, as rows of an alpha-beta scan."""
+    regions = list(reader)
+    planes = np.array([[float(r['cost_perf']), float(r['cost_dist']), float(r['cost_change'])] for r in regions])
+    members = [key for key in reader.fieldnames if key.startswith('member')]
+    rows = []
+    for ia in range(no_of_steps+1):
+        for ib in range(no_of_steps+1-ia):
+            alpha, beta = ia/no_of_steps, ib/no_of_steps
+            costs = planes @ np.array([1-alpha-beta, alpha, beta])
+            i = int(np.argmin(costs))
+            row = dict(alpha=alpha, beta=beta, min_val=costs[i])
+            row.update({key: regions[i][key] for key in members})
+            rows.append(row)
+    return rows
+
 def selection_triangle(optimal_models_csv,no_of_steps,plotname="optimal_subsets.png"):
     filename = optimal_models_csv
 
     with open(filename, 'r') as f:
         reader = csv.DictReader(f)
+        if 'vertices' in reader.fieldnames:
+            # exact region map, can be drawn at any resolution
+            reader = region_table_rows(reader, no_of_steps)
         data = []
         for d in reader:
+            # top_k scans list several subsets per alpha-beta pair, the best one has rank 0
+            if d.get('rank', '0') != '0':
+                continue
             d['alpha'] = np.round(float(d['alpha']), 3)
             d['beta'] = np.round(float(d['beta']), 3)
-            nr_mem = len(d)-3
+            nr_mem = len([key for key in d if key.startswith('member')])
             d['models_str'] = ', '.join(sorted([d[f'member{i}'] for i in range(nr_mem)]))
             data.append(d)
 # generalize d of member
@@ -8,490 +8,103 @@ from . import function as csf
 # ################################
 
 
-def pre_process_perf(path, cmip, im_or_em, season_region):
-    if cmip in ['CMIP5','CMIP6']:
-        deltas_5 = pre_process_perf_load_delta(path, 'CMIP5', season_region)
-        deltas_6 = pre_process_perf_load_delta(path, 'CMIP6', season_region)
-    if cmip == 'CH202x':
-        deltas_5 = pre_process_perf_load_delta(path, 'CH202x', season_region)
-        deltas_6 = pre_process_perf_load_delta(path, 'CH202x_CMIP6', season_region)
-    return pre_process_perf_rest(deltas_5, deltas_6, cmip, im_or_em, season_region)
-
-def pre_process_perf_load_delta(path, cmip, season_region):
-    if cmip not in ['CMIP5','CMIP6','CH202x','CH202x_CMIP6']:
-        raise NotImplementedError(cmip)
-
-    # CMIP5 and CMIP6 predictors
-
-    ## CMIP5 JJA CEU
-    if cmip == 'CMIP5' and season_region == 'JJA_CEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SW_jja_fn = 'swcre_mon_CMIP5_rcp85_g025_CEU_jja_2001-2018_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSW_jja_base = csf.load_models(path,SW_jja_fn,cmip,default_models=True)
-        dsPr_jja_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SWobs_jja_fn = 'swcre_mon_OBS_g025_CEU_jja_2001-2018_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSWobs_jja_base = csf.load_observations(path,SWobs_jja_fn)
-        dsProbs_jja_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSW_jja_base_delta = csf.compute_predictor_deltas(dsSW_jja_base,dsSWobs_jja_base,'swcre')
-        dsPr_jja_base_delta = csf.compute_predictor_deltas(dsPr_jja_base,dsProbs_jja_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSW_jja_base_delta, dsPr_jja_base_delta]
-
-    ## CMIP5 DJF NEU
-    if cmip == 'CMIP5' and season_region == 'DJF_NEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-    ## CMIP5 DJF CEU
-    if cmip == 'CMIP5' and season_region == 'DJF_CEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-#################################################################
-
-    ## CH202x JJA CEU
-    if cmip == 'CH202x' and season_region == 'JJA_CEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsPr_jja_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsProbs_jja_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsPr_jja_base_delta = csf.compute_predictor_deltas(dsPr_jja_base,dsProbs_jja_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsPr_jja_base_delta]
-
-    ## CH202x DJF NEU
-    if cmip == 'CH202x' and season_region == 'DJF_NEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-    ## CH202x DJF CEU
-    if cmip == 'CH202x' and season_region == 'DJF_CEU':
-        SST_fn = 'tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP5_rcp85_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-#################################################################
-
-    ## CMIP6 JJA CEU
-    if cmip == 'CMIP6' and season_region == 'JJA_CEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SW_jja_fn = 'swcre_mon_CMIP6_SSP585_g025_CEU_jja_2001-2018_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSW_jja_base = csf.load_models(path,SW_jja_fn,cmip,default_models=True)
-        dsPr_jja_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SWobs_jja_fn = 'swcre_mon_OBS_g025_CEU_jja_2001-2018_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSWobs_jja_base = csf.load_observations(path,SWobs_jja_fn)
-        dsProbs_jja_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSW_jja_base_delta = csf.compute_predictor_deltas(dsSW_jja_base,dsSWobs_jja_base,'swcre')
-        dsPr_jja_base_delta = csf.compute_predictor_deltas(dsPr_jja_base,dsProbs_jja_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSW_jja_base_delta, dsPr_jja_base_delta]
-
-    ## CMIP6 DJF NEU
-    if cmip == 'CMIP6' and season_region == 'DJF_NEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-    ## CMIP6 DJF CEU
-    if cmip == 'CMIP6' and season_region == 'DJF_CEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        SW_ann_fn = 'swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsSW_ann_base = csf.load_models(path,SW_ann_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        SWobs_ann_fn = 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsSWobs_ann_base = csf.load_observations(path,SWobs_ann_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsSW_ann_base_delta = csf.compute_predictor_deltas(dsSW_ann_base,dsSWobs_ann_base,'swcre')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsSW_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-#################################################################
-
-    ## CH202x_CMIP6 JJA CEU
-    if cmip == 'CH202x_CMIP6' and season_region == 'JJA_CEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsPr_jja_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsProbs_jja_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsPr_jja_base_delta = csf.compute_predictor_deltas(dsPr_jja_base,dsProbs_jja_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsPr_jja_base_delta]
-
-    ## CH202x_CMIP6 DJF NEU
-    if cmip == 'CH202x_CMIP6' and season_region == 'DJF_NEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
-
-    ## CH202x_CMIP6 DJF CEU
-    if cmip == 'CH202x_CMIP6' and season_region == 'DJF_CEU':
-        SST_fn = 'tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc'
-        T_base_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc'
-        T_his_fn = 'tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc'
-        SLP_djf_fn = 'psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc'
-        Pr_fn = 'pr_mon_CMIP6_hist_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        # load, filter for common models
-        dsSST_ann_base = csf.load_models(path,SST_fn,cmip,default_models=True)
-        dsT_ann_base = csf.load_models(path,T_base_fn,cmip,default_models=True)
-        dsT_ann_his = csf.load_models(path,T_his_fn,cmip,default_models=True)
-        dsSLP_djf_base = csf.load_models(path,SLP_djf_fn,cmip,default_models=True)
-        dsPr_djf_base = csf.load_models(path,Pr_fn,cmip,default_models=True)
-
-        # load observations
-        SSTobs_fn = 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc'
-        Tobs_base_fn = 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc'
-        Tobs_his_fn = 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc'
-        SLPobs_djf_fn = 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc'
-        Probs_fn = 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc'
-
-        dsSSTobs_ann_base = csf.load_observations(path,SSTobs_fn)
-        dsTobs_ann_base = csf.load_observations(path,Tobs_base_fn)
-        dsTobs_ann_his = csf.load_observations(path,Tobs_his_fn)
-        dsSLPobs_djf_base = csf.load_observations(path,SLPobs_djf_fn)
-        dsProbs_djf_base = csf.load_observations(path,Probs_fn)
-
-        # compute predictor-obs RMSEs
-        dsSST_ann_base_delta = csf.compute_predictor_deltas(dsSST_ann_base,dsSSTobs_ann_base,'tos')
-        dsT_ann_base_delta = csf.compute_predictor_deltas(dsT_ann_base,dsTobs_ann_base,'tas')
-        dsT_ann_his_delta = csf.compute_predictor_deltas(dsT_ann_his,dsTobs_ann_his,'tas')
-        dsSLP_djf_base_delta = csf.compute_predictor_deltas(dsSLP_djf_base,dsSLPobs_djf_base,'psl')
-        dsPr_djf_base_delta = csf.compute_predictor_deltas(dsPr_djf_base,dsProbs_djf_base,'pr')
-
-        return [dsSST_ann_base_delta, dsT_ann_base_delta, dsT_ann_his_delta, dsSLP_djf_base_delta, dsPr_djf_base_delta]
+# performance predictors: variable, region and season of the g025 fields, averaging period, and the experiment
+# of the model files of each ensemble generation (the observation files do not depend on the generation)
+PREDICTORS = {
+    'SST_ann': dict(variable='tos', region='NAWH', season='ann', period='1995-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+    'SW_ann': dict(variable='swcre', region='SHML', season='ann', period='2001-2018', experiment={'CMIP5':'rcp85', 'CMIP6':'SSP585'}),
+    'T_base': dict(variable='tas', region='EUR', season='ann', period='1995-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+    'T_his': dict(variable='tas', region='EUR', season='ann', period='1950-1969', experiment={'CMIP5':'hist', 'CMIP6':'hist'}),
+    'SW_jja': dict(variable='swcre', region='CEU', season='jja', period='2001-2018', experiment={'CMIP5':'rcp85', 'CMIP6':'SSP585'}),
+    'SLP_djf': dict(variable='psl', region='NATL', season='djf', period='1950-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+    'Pr_jja_CEU': dict(variable='pr', region='EOBS-CEU', season='jja', period='1995-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+    'Pr_djf_NEU': dict(variable='pr', region='EOBS-NEU', season='djf', period='1995-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+    'Pr_djf_CEU': dict(variable='pr', region='EOBS-CEU', season='djf', period='1995-2014', experiment={'CMIP5':'rcp85', 'CMIP6':'hist'}),
+}
+
+# predictors of each (cmip, season_region), in the order they enter the performance metric
+PREDICTOR_SETS = {
+    ('CMIP5','JJA_CEU'): ['SST_ann','SW_ann','T_base','T_his','SW_jja','Pr_jja_CEU'],
+    ('CMIP5','DJF_NEU'): ['SST_ann','SW_ann','T_base','T_his','SLP_djf','Pr_djf_NEU'],
+    ('CMIP5','DJF_CEU'): ['SST_ann','SW_ann','T_base','T_his','SLP_djf','Pr_djf_CEU'],
+    ('CH202x','JJA_CEU'): ['SST_ann','T_base','T_his','Pr_jja_CEU'],
+    ('CH202x','DJF_NEU'): ['SST_ann','T_base','T_his','SLP_djf','Pr_djf_NEU'],
+    ('CH202x','DJF_CEU'): ['SST_ann','T_base','T_his','SLP_djf','Pr_djf_CEU'],
+    ('CMIP6','JJA_CEU'): ['SST_ann','SW_ann','T_base','T_his','SW_jja','Pr_jja_CEU'],
+    ('CMIP6','DJF_NEU'): ['SST_ann','SW_ann','T_base','T_his','SLP_djf','Pr_djf_NEU'],
+    ('CMIP6','DJF_CEU'): ['SST_ann','SW_ann','T_base','T_his','SLP_djf','Pr_djf_CEU'],
+    ('CH202x_CMIP6','JJA_CEU'): ['SST_ann','T_base','T_his','Pr_jja_CEU'],
+    ('CH202x_CMIP6','DJF_NEU'): ['SST_ann','T_base','T_his','SLP_djf','Pr_djf_NEU'],
+    ('CH202x_CMIP6','DJF_CEU'): ['SST_ann','T_base','T_his','SLP_djf','Pr_djf_CEU'],
+}
+
+# ensemble generation of the model files used for each cmip
+PREDICTOR_GENERATIONS = {'CMIP5':'CMIP5', 'CH202x':'CMIP5', 'CMIP6':'CMIP6', 'CH202x_CMIP6':'CMIP6'}
+
+def predictor_model_fn(predictor, cmip):
+    p = PREDICTORS[predictor]
+    generation = PREDICTOR_GENERATIONS[cmip]
+    return f"{p['variable']}_mon_{generation}_{p['experiment'][generation]}_g025_{p['region']}_{p['season']}_{p['period']}_mean.nc"
+
+def predictor_obs_fn(predictor):
+    p = PREDICTORS[predictor]
+    return f"{p['variable']}_mon_OBS_g025_{p['region']}_{p['season']}_{p['period']}_mean.nc"
+
+# io_workers files are opened at once, with chunks the fields are loaded as dask arrays and reduced in parallel
+def pre_process_perf(path, cmip, im_or_em, season_region, io_workers=1, chunks=None):
+    return pre_process_perf_configurations(path, [(cmip, im_or_em, season_region)], io_workers=io_workers, chunks=chunks)[(cmip, im_or_em, season_region)]
+
+# performance metric of several (cmip, im_or_em, season_region) configurations, loading the predictors of all at once
+def pre_process_perf_configurations(path, configurations, io_workers=1, chunks=None):
+    pairs = {}
+    for cmip, im_or_em, season_region in configurations:
+        if cmip in ['CMIP5','CMIP6']:
+            pairs[(cmip, im_or_em, season_region)] = ('CMIP5', 'CMIP6')
+        elif cmip == 'CH202x':
+            pairs[(cmip, im_or_em, season_region)] = ('CH202x', 'CH202x_CMIP6')
+        else:
+            raise NotImplementedError(cmip)
+    deltas = load_predictor_deltas(path, [(c, season_region) for (_, _, season_region), pair in pairs.items() for c in pair], io_workers=io_workers, chunks=chunks)
+    res = {}
+    for (cmip, im_or_em, season_region), (cmip_5, cmip_6) in pairs.items():
+        res[(cmip, im_or_em, season_region)] = pre_process_perf_rest(deltas[(cmip_5, season_region)], deltas[(cmip_6, season_region)], cmip, im_or_em, season_region)
+    return res
+
+def pre_process_perf_load_delta(path, cmip, season_region, io_workers=1, chunks=None):
+    return load_predictor_deltas(path, [(cmip, season_region)], io_workers=io_workers, chunks=chunks)[(cmip, season_region)]
+
+# predictor-obs RMSEs of several (cmip, season_region) configurations.
+# every model and observation file is loaded once and every RMSE is computed once for all members of the file,
+# the configurations sharing a predictor only select their common models from it.
+# the files are opened by io_workers threads; with chunks, the RMSEs are computed lazily and together
+def load_predictor_deltas(path, configurations, io_workers=1, chunks=None):
+    for cmip, season_region in configurations:
+        if cmip not in PREDICTOR_GENERATIONS:
+            raise NotImplementedError(cmip)
+        if (cmip, season_region) not in PREDICTOR_SETS:
+            raise NotImplementedError(season_region)
+
+    # (model file, obs file) pairs and their variable
+    pairs = {}
+    for cmip, season_region in configurations:
+        for predictor in PREDICTOR_SETS[(cmip, season_region)]:
+            pairs[(predictor_model_fn(predictor, cmip), predictor_obs_fn(predictor))] = PREDICTORS[predictor]['variable']
+
+    # load all members and observations
+    models = csf.load_concurrently(lambda fn: csf.load_models(path,fn,None,default_models=False,chunks=chunks), [model_fn for model_fn, _ in pairs], io_workers)
+    observations = csf.load_concurrently(lambda fn: csf.load_observations(path,fn,chunks=chunks), [obs_fn for _, obs_fn in pairs], io_workers)
+
+    # compute predictor-obs RMSEs
+    rmses = {(model_fn, obs_fn): csf.compute_predictor_deltas(models[model_fn],observations[obs_fn],key) for (model_fn, obs_fn), key in pairs.items()}
+    if chunks is not None:
+        rmses = csf.compute_together(rmses)
+
+    # filter for common models
+    deltas = {}
+    for cmip, season_region in configurations:
+        deltas[(cmip, season_region)] = [csf.select_default_common_models(rmses[(predictor_model_fn(predictor, cmip), predictor_obs_fn(predictor))],cmip)
+                                         for predictor in PREDICTOR_SETS[(cmip, season_region)]]
+    return deltas
 
 
 def pre_process_perf_rest(deltas_5, deltas_6, cmip, im_or_em, season_region):
@@ -530,7 +143,7 @@ def pre_process_perf_rest(deltas_5, deltas_6, cmip, im_or_em, season_region):
 # Spread
 # ################################
 
-def pre_process_spread(path, cmip, im_or_em, season_region):
+def pre_process_spread(path, cmip, im_or_em, season_region, io_workers=1):
     if cmip not in ['CMIP5','CMIP6','CH202x']:
         raise NotImplementedError(cmip)
 
@@ -555,8 +168,8 @@ def pre_process_spread(path, cmip, im_or_em, season_region):
         changePr_fn = 'pr_CMIP6_SSP585_CEU_djf_2041-2060_1995-2014_diff.nc'
 
     # load, filter for common models
-    dsT_target_ts = csf.load_models(path,changeT_fn,cmip,default_models=True)
-    dsPr_target_ts = csf.load_models(path,changePr_fn,cmip,default_models=True)
+    loaded = csf.load_concurrently(lambda fn: csf.load_models(path,fn,cmip,default_models=True), [changeT_fn, changePr_fn], io_workers)
+    dsT_target_ts, dsPr_target_ts = loaded[changeT_fn], loaded[changePr_fn]
 
     # aggregate ensemble means or select spread members
     dsT_target_ts_sel = csf.ensemble_mean_or_individual_member(dsT_target_ts,choice=im_or_em,CMIP=cmip,season_region=season_region,key='tas')
@@ -564,21 +177,18 @@ def pre_process_spread(path, cmip, im_or_em, season_region):
     targets = [dsT_target_ts_sel,dsPr_target_ts_sel]
 
 
-    # normalize and get squared difference
-    ds_sqr_diff = []
-
-    for ds in targets:
-        ds_sqr_diff.append(csf.get_squared_diff(csf.normalize_spread_component(ds)))
+    # normalize and get squared difference, summed over the targets
+    ds_sqr_diff = csf.get_squared_diff(*[csf.normalize_spread_component(ds) for ds in targets])
 
-    # sum and sqrt to compute spread metric
-    ds_spread_metric = np.sqrt(ds_sqr_diff[0]+ds_sqr_diff[1])
+    # sqrt to compute spread metric
+    ds_spread_metric = np.sqrt(ds_sqr_diff)
     return ds_spread_metric, targets
 
 # ################################
 # Independence
 # ################################
 
-def pre_process_indep(path, cmip, im_or_em,season_region):
+def pre_process_indep(path, cmip, im_or_em,season_region, io_workers=1):
     if cmip not in ['CMIP5','CMIP6','CH202x']:
         raise NotImplementedError(cmip)
 
@@ -591,8 +201,8 @@ def pre_process_indep(path, cmip, im_or_em,season_region):
         ind_psl_fn = 'psl_mon_CMIP6_hist_g025_indmask_ann_1905-2005_mean.nc'
 
     # load, filter for common models
-    dsT_clim_mask = csf.load_models(path,ind_tas_fn,cmip,default_models=True)
-    dsP_clim_mask = csf.load_models(path,ind_psl_fn,cmip,default_models=True)
+    loaded = csf.load_concurrently(lambda fn: csf.load_models(path,fn,cmip,default_models=True), [ind_tas_fn, ind_psl_fn], io_workers)
+    dsT_clim_mask, dsP_clim_mask = loaded[ind_tas_fn], loaded[ind_psl_fn]
 
     # aggregate ensemble means or select spread members
     dsT_clim_mask_sel = csf.ensemble_mean_or_individual_member(dsT_clim_mask,choice=im_or_em,CMIP=cmip,season_region=season_region,key='tas')
@@ -23,12 +23,14 @@ def main():
     cmip = 'CMIP6'
     im_or_em = 'IM'
     season_region = 'JJA_CEU'
+    io_workers = 1 # predictor files opened at once
+    chunks = None # e.g. {} to load the performance predictors lazily with dask (if installed)
     #####################################################
 
     #  pre-processing: obtain performance, independence, and spread metrics
-    dsDeltaQ = cspp.pre_process_perf(perf_path, cmip, im_or_em, season_region)
-    ds_spread_metric,targets = cspp.pre_process_spread(spread_path, cmip, im_or_em, season_region)
-    dsWi = cspp.pre_process_indep(indep_path, cmip, im_or_em, season_region)
+    dsDeltaQ = cspp.pre_process_perf(perf_path, cmip, im_or_em, season_region, io_workers=io_workers, chunks=chunks)
+    ds_spread_metric,targets = cspp.pre_process_spread(spread_path, cmip, im_or_em, season_region, io_workers=io_workers)
+    dsWi = cspp.pre_process_indep(indep_path, cmip, im_or_em, season_region, io_workers=io_workers)
 
     # save output file
     outfile = 'perf_ind_spread_metrics.nc'
@@ -44,14 +46,26 @@ def main():
     m = 2 # number of models in the subset
     alpha = 10 # number of steps in alpha's [0,1] range
     beta = 10 # number of steps in alpha's [0,1] range
-    perf_cutoff = 2 # performance threshold to pre-filter models (if desired)
+    perf_cutoff = 2 # performance threshold to pre-filter models (if desired), a list of thresholds for scan = 'cutoff_sweep'
     max_workers = 1
+    shared_data = False # parallel runs: publish the metrics to the workers once
+    result_store = 'files' # parallel runs: 'files' (one csv per combination) or 'sqlite' (a single file)
+    shard_workers = 1 # cores used within one alpha-beta combination
+    prefilter = False # remove members that cannot be in the optimal subset before the search
     min2 = False
+    solver = 'numpy' # how combinations are searched, see readme
+    scan = 'grid' # how the alpha-beta grid is scanned, see readme
+    cache = None # sqlite file of results reused by runs on the same data and settings, e.g. 'climsips_cache.sqlite'
     ###################################################
 
-    optimal_models_csv = csf.select_models(outfile, cmip, im_or_em, season_region, m, alpha, beta, perf_cutoff, max_workers=max_workers, min2=min2)
+    optimal_models_csv = csf.select_models(outfile, cmip, im_or_em, season_region, m, alpha, beta, perf_cutoff, max_workers=max_workers, min2=min2, solver=solver, scan=scan, shard_workers=shard_workers, prefilter=prefilter, shared_data=shared_data, result_store=result_store, cache=cache)
 
-    csp.selection_triangle(optimal_models_csv,alpha,plotname="optimal_subsets.png")
+    if scan == 'cutoff_sweep':
+        # one scan per performance threshold
+        for csv_file in optimal_models_csv:
+            csp.selection_triangle(csv_file,alpha,plotname=f"optimal_subsets_{csv_file.stem}.png")
+    else:
+        csp.selection_triangle(optimal_models_csv,alpha,plotname="optimal_subsets.png")
 
     print('---- subselection complete ----')
 
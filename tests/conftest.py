@@ -0,0 +1,51 @@
+import csv
+import os
+import sys
+
+import numpy as np
+import pytest
+import xarray as xr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# synthetic performance, independence and spread inputs for n members
+def make_data(n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    members = [f'M{i:02d}-r1i1p1f1' for i in range(n)]
+    perf = rng.uniform(0.5, 2.5, n)
+    a = rng.uniform(0.2, 2, (n, n))
+    dist = (a + a.T) / 2
+    np.fill_diagonal(dist, np.nan)
+    points = rng.normal(size=(n, 2))
+    change = ((points[:, None, :] - points[None]) ** 2).sum(-1)
+    np.fill_diagonal(change, np.nan)
+    return xr.Dataset(dict(delta_q=(['member'], perf),
+                           delta_i=(['member', 'member_model'], dist),
+                           change=(['member', 'member_model'], change),
+                           tas_change=(['member'], points[:, 0]),
+                           pr_change=(['member'], points[:, 1])),
+                      coords=dict(member=members, member_model=members))
+
+
+@pytest.fixture
+def data():
+    return make_data()
+
+
+
+# rows of a scan csv, the numeric columns (before the members) as floats
+def read_scan(filename):
+    with open(filename, newline='') as f:
+        header, *rows = list(csv.reader(f))
+    numeric = [i for i, name in enumerate(header) if not name.startswith('member')]
+    return [[float(value) if i in numeric else value for i, value in enumerate(row)] for row in rows]
+
+
+# asserts that two scans select the same subsets with the same costs
+def assert_same_scan(rows, expected):
+    assert len(rows) == len(expected)
+    for row, expected_row in zip(rows, expected):
+        assert [value for value in row if isinstance(value, str)] == [value for value in expected_row if isinstance(value, str)]
+        np.testing.assert_allclose([value for value in row if not isinstance(value, str)],
+                                   [value for value in expected_row if not isinstance(value, str)], rtol=1e-9, atol=1e-12)
@@ -0,0 +1,29 @@
+import pytest
+
+import ClimSIPS.function as csf
+from conftest import assert_same_scan, read_scan
+
+
+@pytest.mark.parametrize('options, grid_options', [
+    (dict(), dict()),
+    (dict(min2=True), dict(min2=True)),
+    (dict(top_k=3), dict(top_k=3)),
+])
+def test_adaptive_scan_matches_grid(tmp_path, monkeypatch, data, options, grid_options):
+    monkeypatch.chdir(tmp_path)
+    adaptive = read_scan(csf.adaptive_scan_run(3, 'adaptive', 'em', 'test', 8, 8, 2.2, data, **options))
+    grid = read_scan(csf.multi_run(3, 'grid', 'em', 'test', 8, 8, 2.2, data, **grid_options))
+    assert_same_scan(sorted(adaptive), sorted(grid))
+
+
+def test_adaptive_silent(capsys, data):
+    members, scan = csf.adaptive_best_k_models(*csf.get_metrics(data), 3, 1, 8, 2.2, silent=True)
+    assert capsys.readouterr().out == ''
+    assert len(scan) == 9 * 10 // 2
+    assert sum(solved for _, _, solved in scan.values()) <= len(scan)
+
+
+def test_adaptive_requires_equal_steps(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        csf.adaptive_scan_run(3, 'adaptive', 'em', 'test', 8, 4, 2.2, data)
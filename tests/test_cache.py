@@ -0,0 +1,24 @@
+import pytest
+
+import ClimSIPS.function as csf
+
+
+def test_cached_result_returned(tmp_path, monkeypatch, data):
+    cache = tmp_path / 'cache.sqlite'
+    result = csf.single_run(3, 0.3, 0.3, 2.2, data, silent=True, cache=cache)
+    monkeypatch.setattr(csf, 'get_best_m_models', None)
+    assert csf.single_run(3, 0.3, 0.3, 2.2, data, silent=True, cache=cache) == result
+
+
+def test_cache_key_settings():
+    key = csf.result_cache_key('digest', 3, 0.3, 0.3, 2.2, 'numpy')
+    assert csf.result_cache_key('digest', 3, 0.3, 0.3, 2.2, 'numpy', prefilter=True) != key
+    assert csf.result_cache_key('digest', 3, 0.3, 0.3, 2.2, 'milp') != key
+    assert csf.result_cache_key('digest', 3, 0.3, 0.3, 2.2, 'numpy', top_k=2) != key
+
+
+def test_cache_only_for_grid_scan(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, scan='single_pass', cache=tmp_path / 'cache.sqlite')
@@ -0,0 +1,82 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+import ClimSIPS.dataset_cache as csdc
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    csdc.clear_dataset_cache()
+    paths = []
+    open_dataset = xr.open_dataset
+
+    def counting(path, **kwargs):
+        paths.append(os.path.basename(path))
+        return open_dataset(path, **kwargs)
+    monkeypatch.setattr(xr, 'open_dataset', counting)
+    yield paths
+    csdc.clear_dataset_cache()
+
+
+def write(path, values):
+    time = pd.date_range('2000-01-01', periods=len(values), freq='D')
+    xr.Dataset({'tas': ('time', np.asarray(values, dtype=float))}, coords={'time': time}).to_netcdf(path)
+    return str(path)
+
+
+def test_cache_hit(tmp_path, opened):
+    path = write(tmp_path / 'a.nc', [1, 2, 3])
+    first = csdc.open_dataset(path)
+    first['tas'] = first.tas * 2
+    second = csdc.open_dataset(path)
+    assert opened == ['a.nc']
+    # the cached dataset is not changed through the returned copies
+    assert second.tas.values.tolist() == [1, 2, 3]
+    csdc.open_dataset(path, decode_times=False)
+    assert opened == ['a.nc', 'a.nc']
+
+
+def test_changed_file_is_reopened(tmp_path, opened):
+    path = write(tmp_path / 'a.nc', [1, 2, 3])
+    csdc.open_dataset(path)
+    # new size
+    write(path, [4, 5, 6, 7])
+    assert csdc.open_dataset(path).tas.values.tolist() == [4, 5, 6, 7]
+    # same size, new modification time
+    write(path, [8, 9, 10, 11])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert csdc.open_dataset(path).tas.values.tolist() == [8, 9, 10, 11]
+    assert opened == ['a.nc'] * 3
+    assert len(csdc.dataset_cache) == 1
+
+
+def test_eviction(tmp_path, opened, monkeypatch):
+    monkeypatch.setattr(csdc, 'DATASET_CACHE_SIZE', 2)
+    paths = [write(tmp_path / f'{name}.nc', [i, i + 1]) for i, name in enumerate('abc')]
+    chunked = csdc.open_dataset(paths[0], chunks={})
+    csdc.open_dataset(paths[1])
+    csdc.open_dataset(paths[0], chunks={})
+    csdc.open_dataset(paths[2])
+    assert len(csdc.dataset_cache) == 2
+    assert opened == ['a.nc', 'b.nc', 'c.nc']
+    # b was the least recently used
+    csdc.open_dataset(paths[1])
+    assert opened == ['a.nc', 'b.nc', 'c.nc', 'b.nc']
+    # a chunked dataset dropped from the cache can still be read
+    assert chunked.tas.values.tolist() == [0, 1]
+
+
+# as select_models opens the metrics file
+def test_use_cftime_without_deprecation_warning(tmp_path, opened):
+    path = str(tmp_path / 'metrics.nc')
+    xr.Dataset({'perf': ('member', [1., 2.])}, coords={'member': ['a', 'b']}).to_netcdf(path)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        ds = csdc.open_dataset(path, use_cftime=True)
+    assert ds.perf.values.tolist() == [1., 2.]
@@ -0,0 +1,41 @@
+import time
+
+import numpy as np
+import pytest
+
+import ClimSIPS.function as csf
+
+
+def cost_matrix(data, alpha=0.3, beta=0.3, perf_cutoff=2.2):
+    cost = csf.get_cost_matrix(data.delta_q, data.delta_i, data.change, alpha, beta, perf_cutoff)
+    return cost, list(cost.member.data)
+
+
+@pytest.mark.parametrize('k', [1, 2, 5])
+def test_heuristic_finds_k_best(data, k):
+    cost, members = cost_matrix(data)
+    exact = csf.numpy_combination_search(cost, members, 4, k, True, time.time())
+    heuristic = csf.heuristic_combination_search(cost, members, 4, k, True, time.time())
+    assert len(heuristic) == k
+    assert [combo for _, _, combo in heuristic] == [tuple(combo) for _, _, combo in exact]
+    assert [rank for _, rank, _ in heuristic] == [rank for _, rank, _ in exact]
+    np.testing.assert_allclose([val for val, _, _ in heuristic], [val for val, _, _ in exact])
+
+
+def test_heuristic_min2(data):
+    args = (data.delta_q, data.delta_i, data.change, 4, 0.3, 0.3, 2.2)
+    assert csf.get_best_m_models(*args, min2=True, solver='heuristic') == csf.get_best_m_models(*args, min2=True)
+
+
+def test_heuristic_restarts_on_workers(data):
+    cost, members = cost_matrix(data)
+    serial = csf.search_subsets(cost, members, 4, 3, solver='heuristic')
+    parallel = csf.search_subsets(cost, members, 4, 3, solver='heuristic', shard_workers=2)
+    assert [combo for _, _, combo in serial] == [combo for _, _, combo in parallel]
+
+
+def test_revolving_door_returns_ranks(data):
+    cost, members = cost_matrix(data)
+    exact = csf.numpy_combination_search(cost, members, 4, 3, True, time.time())
+    door = csf.revolving_door_search(cost, members, 4, 3, True, time.time())
+    assert [rank for _, rank, _ in door] == [rank for _, rank, _ in exact]
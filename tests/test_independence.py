@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import xarray as xr
+import xskillscore
+
+import ClimSIPS.function as csf
+
+
+def fields(n=6, seed=0, masks='common'):
+    rng = np.random.default_rng(seed)
+    lat, lon = np.arange(-87.5, 90, 5.), np.arange(2.5, 360, 5.)
+    data = 280 + 3 * rng.normal(size=(n, len(lat), len(lon)))
+    if masks == 'common':
+        data[:, rng.random((len(lat), len(lon))) < 0.3] = np.nan
+    else:
+        data[rng.random(data.shape) < 0.2] = np.nan
+    return xr.DataArray(data, dims=('member', 'lat', 'lon'),
+                        coords=dict(member=[f'M{i}' for i in range(n)], lat=lat, lon=lon))
+
+
+# pairwise loop over xskillscore.rmse, as get_error was computed before
+def reference_error(ds):
+    weights = xr.concat([np.cos(np.deg2rad(ds.lat))] * len(ds.lon), 'lon')
+    weights['lon'] = ds.lon
+    mod_coords = ds.member.values
+    res = xr.DataArray(np.empty((len(mod_coords), len(mod_coords))), dims=('member', 'member_model'),
+                       coords=dict(member=mod_coords, member_model=mod_coords))
+    for mod1 in ds:
+        for mod2 in ds:
+            res.loc[dict(member=mod1.member, member_model=mod2.member)] = \
+                xskillscore.rmse(mod1, mod2, dim=['lat', 'lon'], weights=weights, skipna=True)
+    return res.where(res != 0)
+
+
+@pytest.mark.parametrize('masks', ['common', 'varied'])
+def test_error_matches_pairwise_rmse(masks):
+    ds = fields(masks=masks)
+    expected, result = reference_error(ds), csf.get_error(ds)
+    assert (np.isnan(expected) == np.isnan(result)).all()
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_identical_members_are_masked():
+    ds = fields()
+    ds[1] = ds[0]
+    result = csf.get_error(ds)
+    assert np.isnan(result[0, 1]) and np.isnan(result[1, 0])
+    assert np.isnan(np.diag(result)).all()
+    assert np.count_nonzero(np.isnan(result)) == len(ds) + 2
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+import ClimSIPS.function as csf
+from conftest import make_data
+
+
+# element-wise loops, as norm_matrices was computed before
+def reference_norm_matrices(perf, dist, change, perf_cutoff):
+    members = list(perf.where(perf < perf_cutoff, drop=True).member.data)
+    n = len(members)
+    perf = perf.sel(member=members)
+    dist = dist.sel(member=members, member_model=members)
+    change = change.sel(member=members, member_model=members)
+
+    norm_dist = (dist - np.nanmean(dist)) / np.nanstd(dist) / 2
+    norm_change = (change - np.nanmean(change)) / np.nanstd(change) / 2
+
+    perf_diag = xr.DataArray(np.diag(perf.data), dims=['member', 'member_model'],
+                             coords=dict(member=members, member_model=members))
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                perf_diag[i, j] = np.nan
+
+    norm_perf = (perf_diag - np.nanmean(perf_diag)) / np.nanstd(perf_diag)
+
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                norm_dist[i, j] = 0
+                norm_change[i, j] = 0
+            else:
+                norm_perf[i, j] = 0
+
+    return norm_perf, norm_dist, norm_change
+
+
+@pytest.mark.parametrize('perf_cutoff', [1.5, 2.2, 10.])
+@pytest.mark.parametrize('shuffled', [False, True])
+def test_norm_matrices_match_loops(perf_cutoff, shuffled):
+    data = make_data(n=15)
+    perf, dist, change = data.delta_q, data.delta_i, data.change
+    if shuffled:
+        # the matrices need not list the members in the order of the performance metric
+        order = np.random.default_rng(1).permutation(len(perf))
+        dist = dist.isel(member=order)
+        change = change.isel(member_model=order)
+    for result, expected in zip(csf.norm_matrices(perf, dist, change, perf_cutoff),
+                                reference_norm_matrices(perf, dist, change, perf_cutoff)):
+        assert list(result.member.data) == list(expected.member.data)
+        assert list(result.member_model.data) == list(expected.member_model.data)
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-15)
@@ -0,0 +1,34 @@
+import pytest
+
+import ClimSIPS.function as csf
+from conftest import assert_same_scan, read_scan
+
+
+def test_unknown_result_store(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError, match='sqlite'):
+        csf.multi_parallel_run(3, 'parallel', 'em', 'test', 4, 4, 2.2, data, 2, result_store='csv')
+
+
+@pytest.mark.parametrize('result_store', ['files', 'sqlite'])
+@pytest.mark.parametrize('shared_data', [False, True])
+def test_parallel_scan_matches_serial(tmp_path, monkeypatch, data, result_store, shared_data):
+    monkeypatch.chdir(tmp_path)
+    parallel = read_scan(csf.multi_parallel_run(3, 'parallel', 'em', 'test', 4, 4, 2.2, data, 2, top_k=2,
+                                                result_store=result_store, shared_data=shared_data))
+    serial = read_scan(csf.multi_run(3, 'serial', 'em', 'test', 4, 4, 2.2, data, top_k=2))
+    assert_same_scan(parallel, serial)
+
+
+@pytest.mark.parametrize('options', [dict(shared_data=True), dict(result_store='sqlite')])
+def test_parallel_options_require_workers(tmp_path, monkeypatch, data, options):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, max_workers=1, **options)
+
+
+def test_parallel_scan_writes_solver_stats(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    filename = csf.multi_parallel_run(3, 'parallel', 'em', 'test', 4, 4, 2.2, data, 2, solver='branch_and_bound')
+    assert len(read_scan(csf.stats_filename(filename))) == len(csf.alpha_beta_grid(4, 4))
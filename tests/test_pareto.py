@@ -0,0 +1,30 @@
+import pytest
+
+import ClimSIPS.function as csf
+from conftest import assert_same_scan, make_data, read_scan
+
+
+def grid_scan(data, m=3, steps=4, perf_cutoff=2.2):
+    return read_scan(csf.multi_run(m, 'grid', 'em', 'test', steps, steps, perf_cutoff, data))
+
+
+def test_pareto_scan_matches_grid(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    pareto = read_scan(csf.pareto_scan_run(3, 'pareto', 'em', 'test', 4, 4, 2.2, data))
+    assert_same_scan(pareto, grid_scan(data))
+
+
+def test_pareto_archive_rebuilt_for_other_data(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    filename = csf.pareto_scan_run(3, 'pareto', 'em', 'test', 4, 4, 2.2, data)
+    filename.unlink()
+    other = make_data(seed=1)
+    pareto = read_scan(csf.pareto_scan_run(3, 'pareto', 'em', 'test', 4, 4, 2.2, other))
+    assert_same_scan(pareto, grid_scan(other))
+
+
+def test_pareto_scan_rejects_top_k(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, scan='pareto', top_k=2)
@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+import ClimSIPS.dataset_cache as csdc
+import ClimSIPS.function as csf
+import ClimSIPS.member_selection as csms
+import ClimSIPS.pre_processing as cspp
+
+
+# (model file, observation file, variable) of each predictor, in the order of the performance metric,
+# as listed by the if-chain of pre_process_perf_load_delta before the predictor registry
+BASELINE = {
+    ('CMIP5', 'JJA_CEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('swcre_mon_CMIP5_rcp85_g025_CEU_jja_2001-2018_mean.nc', 'swcre_mon_OBS_g025_CEU_jja_2001-2018_mean.nc', 'swcre'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CMIP5', 'DJF_NEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CMIP5', 'DJF_CEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP5_rcp85_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x', 'JJA_CEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x', 'DJF_NEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x', 'DJF_CEU'): [
+        ('tos_mon_CMIP5_rcp85_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP5_rcp85_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP5_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP5_rcp85_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP5_rcp85_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CMIP6', 'JJA_CEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('swcre_mon_CMIP6_SSP585_g025_CEU_jja_2001-2018_mean.nc', 'swcre_mon_OBS_g025_CEU_jja_2001-2018_mean.nc', 'swcre'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CMIP6', 'DJF_NEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CMIP6', 'DJF_CEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('swcre_mon_CMIP6_SSP585_g025_SHML_ann_2001-2018_mean.nc', 'swcre_mon_OBS_g025_SHML_ann_2001-2018_mean.nc', 'swcre'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x_CMIP6', 'JJA_CEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_jja_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x_CMIP6', 'DJF_NEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-NEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+    ('CH202x_CMIP6', 'DJF_CEU'): [
+        ('tos_mon_CMIP6_hist_g025_NAWH_ann_1995-2014_mean.nc', 'tos_mon_OBS_g025_NAWH_ann_1995-2014_mean.nc', 'tos'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1995-2014_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1995-2014_mean.nc', 'tas'),
+        ('tas_mon_CMIP6_hist_g025_EUR_ann_1950-1969_mean.nc', 'tas_mon_OBS_g025_EUR_ann_1950-1969_mean.nc', 'tas'),
+        ('psl_mon_CMIP6_hist_g025_NATL_djf_1950-2014_mean.nc', 'psl_mon_OBS_g025_NATL_djf_1950-2014_mean.nc', 'psl'),
+        ('pr_mon_CMIP6_hist_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr_mon_OBS_g025_EOBS-CEU_djf_1995-2014_mean.nc', 'pr'),
+    ],
+}
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    loads = []
+
+    def load_models(path, fn, cmip, default_models=True, chunks=None):
+        loads.append(fn)
+        return fn
+
+    def load_observations(path, fn, chunks=None):
+        loads.append(fn)
+        return fn
+
+    monkeypatch.setattr(csf, 'load_models', load_models)
+    monkeypatch.setattr(csf, 'load_observations', load_observations)
+    monkeypatch.setattr(csf, 'compute_predictor_deltas', lambda model, obs, key: (model, obs, key))
+    monkeypatch.setattr(csf, 'select_default_common_models', lambda delta, cmip: delta)
+    return loads
+
+
+def test_registry_covers_baseline():
+    assert set(cspp.PREDICTOR_SETS) == set(BASELINE)
+
+
+@pytest.mark.parametrize('configuration', sorted(BASELINE))
+def test_registry_matches_baseline(recorded, configuration):
+    assert cspp.pre_process_perf_load_delta('path', *configuration) == BASELINE[configuration]
+
+
+def test_files_loaded_once(recorded):
+    deltas = cspp.load_predictor_deltas('path', list(BASELINE))
+    assert deltas == BASELINE
+    assert len(recorded) == len(set(recorded))
+    assert set(recorded) == set(fn for predictors in BASELINE.values() for model_fn, obs_fn, _ in predictors for fn in (model_fn, obs_fn))
+
+
+def test_unknown_configuration(recorded):
+    with pytest.raises(NotImplementedError):
+        cspp.pre_process_perf_load_delta('path', 'CMIP6', 'MAM_MED')
+
+
+# predictor fields of the common members of both generations and the observations on a small grid
+@pytest.fixture
+def predictor_files(tmp_path):
+    rng = np.random.default_rng(0)
+    lat, lon = np.linspace(40., 60., 5), np.linspace(-10., 20., 7)
+    members = {'CMIP5': sorted(set(csms.CMIP5_common_members) | set(csms.CMIP5_RCM_common_members)),
+               'CMIP6': sorted(set(csms.CMIP6_common_members) | set(csms.CMIP6_RCM_common_members))}
+
+    def write(filename, variable, member=None):
+        shape, dims, coords = (len(lat), len(lon)), ('lat', 'lon'), dict(lat=lat, lon=lon)
+        if member is not None:
+            shape, dims, coords = (len(member),) + shape, ('member',) + dims, dict(coords, member=member)
+        values = rng.normal(size=shape)
+        values[..., 0, 0] = np.nan
+        xr.Dataset({variable: (dims, values)}, coords=coords).to_netcdf(tmp_path / filename)
+
+    for generation in members:
+        for predictor in set(cspp.PREDICTOR_SETS[(generation, 'JJA_CEU')]):
+            variable = cspp.PREDICTORS[predictor]['variable']
+            write(cspp.predictor_model_fn(predictor, generation), variable, members[generation])
+            write(cspp.predictor_obs_fn(predictor), variable)
+    csdc.clear_dataset_cache()
+    yield str(tmp_path) + '/'
+    csdc.clear_dataset_cache()
+
+
+@pytest.mark.parametrize('io_workers, chunks', [(4, None), (1, {}), (4, {})])
+def test_concurrent_and_lazy_loading_match_eager(predictor_files, io_workers, chunks):
+    if chunks is not None:
+        pytest.importorskip('dask')
+    configurations = [('CMIP5', 'JJA_CEU'), ('CMIP6', 'JJA_CEU')]
+    expected_deltas = cspp.load_predictor_deltas(predictor_files, configurations)
+    expected_perf = cspp.pre_process_perf(predictor_files, 'CMIP6', 'EM', 'JJA_CEU')
+    # the files are decoded again, not taken from the cache of the eager run
+    csdc.clear_dataset_cache()
+    deltas = cspp.load_predictor_deltas(predictor_files, configurations, io_workers=io_workers, chunks=chunks)
+    for configuration in configurations:
+        for delta, expected in zip(deltas[configuration], expected_deltas[configuration]):
+            xr.testing.assert_allclose(delta.load(), expected)
+    perf = cspp.pre_process_perf(predictor_files, 'CMIP6', 'EM', 'JJA_CEU', io_workers=io_workers, chunks=chunks)
+    xr.testing.assert_allclose(perf.load(), expected_perf)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+import ClimSIPS.function as csf
+
+
+def test_region_map_matches_grid(data):
+    perf, dist, change = csf.get_metrics(data)
+    members, subsets, planes, regions = csf.get_region_map(perf, dist, change, 3, 2.2)
+    assert sum(csf.polygon_area(region) for region in regions) == pytest.approx(0.5)
+    for alpha, beta in csf.alpha_beta_grid(10, 10):
+        costs = csf.plane_costs(planes, alpha, beta)
+        val, optimum = csf.get_best_m_models(perf, dist, change, 3, alpha, beta, 2.2)
+        assert costs.min() == pytest.approx(val, rel=1e-9, abs=1e-12)
+        best = np.flatnonzero(costs <= costs.min() + 1e-9)
+        assert list(optimum) in [[members[i] for i in subsets[j]] for j in best]
+
+
+def test_region_scan_rejects_min2(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, scan='regions', min2=True)
@@ -0,0 +1,64 @@
+import pytest
+
+import ClimSIPS.function as csf
+from conftest import assert_same_scan, make_data, read_scan
+
+
+def interrupted_scan(data, monkeypatch, cells=3):
+    single_run = csf.single_run
+    calls = []
+
+    def failing_single_run(*args, **kwargs):
+        if len(calls) == cells:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return single_run(*args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(csf, 'single_run', failing_single_run)
+        with pytest.raises(KeyboardInterrupt):
+            csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data)
+
+
+def test_partial_scan_resumed(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    interrupted_scan(data, monkeypatch)
+    assert len(read_scan('grid_em_test_alpha-beta-scan.csv.partial')) == 3
+    resumed = read_scan(csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data))
+    (tmp_path / 'fresh').mkdir()
+    monkeypatch.chdir(tmp_path / 'fresh')
+    assert_same_scan(resumed, read_scan(csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data)))
+
+
+def test_partial_scan_of_other_data_discarded(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    interrupted_scan(data, monkeypatch)
+    other = make_data(seed=1)
+    resumed = read_scan(csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, other))
+    (tmp_path / 'fresh').mkdir()
+    monkeypatch.chdir(tmp_path / 'fresh')
+    assert_same_scan(resumed, read_scan(csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, other)))
+
+
+@pytest.mark.parametrize('solver, shard_workers', [('branch_and_bound', 1), ('numpy', 2)])
+def test_checkpoint_requires_serial_numpy(tmp_path, data, solver, shard_workers):
+    with pytest.raises(ValueError):
+        csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 3, 0.3, 0.3, 2.2, solver=solver,
+                              shard_workers=shard_workers, checkpoint=tmp_path / 'cell.checkpoint')
+
+
+def test_cells_warm_started_with_previous_optimum(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    single_run = csf.single_run
+    calls = []
+
+    def recording_single_run(m, alpha, beta, *args, **kwargs):
+        result = single_run(m, alpha, beta, *args, **kwargs)
+        calls.append((list(kwargs['incumbents']), list(result[1])))
+        return result
+
+    monkeypatch.setattr(csf, 'single_run', recording_single_run)
+    csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data, solver='branch_and_bound')
+    assert calls[0][0] == []
+    for (incumbents, _), (_, previous_optimum) in zip(calls[1:], calls[:-1]):
+        assert incumbents == [previous_optimum]
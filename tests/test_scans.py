@@ -0,0 +1,97 @@
+import pytest
+
+import ClimSIPS.function as csf
+from conftest import assert_same_scan, make_data, read_scan
+
+
+@pytest.mark.parametrize('options', [dict(), dict(min2=True), dict(top_k=3)])
+def test_single_pass_matches_grid(tmp_path, monkeypatch, data, options):
+    monkeypatch.chdir(tmp_path)
+    single_pass = read_scan(csf.multi_scan_run(3, 'single_pass', 'em', 'test', 5, 5, 2.2, data, **options))
+    grid = read_scan(csf.multi_run(3, 'grid', 'em', 'test', 5, 5, 2.2, data, **options))
+    assert_same_scan(single_pass, grid)
+
+
+def test_unknown_scan(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError, match='single_pass'):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, scan='everything')
+
+
+def test_grid_scan_writes_solver_stats(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    filename = csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data, solver='branch_and_bound')
+    stats = read_scan(csf.stats_filename(filename))
+    assert len(stats) == len(csf.alpha_beta_grid(4, 4))
+    assert all(len(row) == 5 and row[2] > 0 for row in stats)
+
+
+def test_prefilter_reported_once_per_scan(tmp_path, monkeypatch, capsys, data):
+    monkeypatch.chdir(tmp_path)
+    filename = csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data, prefilter=True)
+    assert capsys.readouterr().out.count('dominance pre-filter') == 1
+    assert all(row[2] <= row[3] for row in read_scan(csf.stats_filename(filename)))
+
+
+@pytest.mark.parametrize('options', [dict(), dict(min2=True), dict(top_k=3)])
+def test_cutoff_sweep_matches_grid(tmp_path, monkeypatch, data, options):
+    monkeypatch.chdir(tmp_path)
+    cutoffs = [1.8, 2.2, 2.6]
+    filenames = csf.cutoff_sweep_run(3, 'sweep', 'em', 'test', 4, 4, cutoffs, data, **options)
+    for perf_cutoff, filename in zip(cutoffs, filenames):
+        grid = csf.multi_run(3, f'grid{perf_cutoff}', 'em', 'test', 4, 4, perf_cutoff, data, **options)
+        assert_same_scan(read_scan(filename), read_scan(grid))
+
+
+def test_warm_start_saves_branch_and_bound_nodes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = make_data(n=20)
+    single_run = csf.single_run
+    incumbents = []
+
+    def recording_single_run(*args, **kwargs):
+        incumbents.append(list(kwargs['incumbents']))
+        return single_run(*args, **kwargs)
+
+    monkeypatch.setattr(csf, 'single_run', recording_single_run)
+    filename = csf.multi_run(4, 'grid', 'em', 'test', 4, 4, 2.5, data, solver='branch_and_bound')
+    assert incumbents[0] == [] and all(len(cell) == 1 for cell in incumbents[1:])
+
+    warm, cold = [], []
+    for alpha, beta, _, nodes, _ in read_scan(csf.stats_filename(filename)):
+        stats = {}
+        csf.get_best_m_models(*csf.get_metrics(data), 4, alpha, beta, 2.5, solver='branch_and_bound', stats=stats)
+        warm.append(nodes)
+        cold.append(stats['nodes'])
+    assert all(w <= c for w, c in zip(warm, cold))
+    assert sum(warm) < sum(cold)
+
+
+def test_cutoff_sweep_single_cutoff(tmp_path, monkeypatch, data):
+    monkeypatch.chdir(tmp_path)
+    filenames = csf.cutoff_sweep_run(3, 'sweep', 'em', 'test', 4, 4, 2.2, data)
+    grid = csf.multi_run(3, 'grid', 'em', 'test', 4, 4, 2.2, data)
+    assert len(filenames) == 1
+    assert_same_scan(read_scan(filenames[0]), read_scan(grid))
+
+
+@pytest.mark.parametrize('scan', ['single_pass', 'cutoff_sweep'])
+@pytest.mark.parametrize('options', [dict(solver='branch_and_bound'), dict(prefilter=True), dict(max_workers=2), dict(shard_workers=2)])
+def test_single_enumeration_scans_reject_solver_options(tmp_path, monkeypatch, data, scan, options):
+    monkeypatch.chdir(tmp_path)
+    data.to_netcdf('metrics.nc')
+    with pytest.raises(ValueError, match=list(options)[0]):
+        csf.select_models('metrics.nc', 'cmip6', 'em', 'test', 3, 4, 4, 2.2, scan=scan, **options)
+
+
+@pytest.mark.parametrize('options', [dict(), dict(min2=True), dict(top_k=3)])
+def test_prefilter_keeps_results(tmp_path, monkeypatch, options):
+    monkeypatch.chdir(tmp_path)
+    data = make_data(n=20)
+    filtered = csf.multi_run(4, 'filtered', 'em', 'test', 5, 5, 2.5, data, prefilter=True, **options)
+    unfiltered = csf.multi_run(4, 'unfiltered', 'em', 'test', 5, 5, 2.5, data, **options)
+    assert_same_scan(read_scan(filtered), read_scan(unfiltered))
+    # the filter removes members (down to less than half of them) in the performance-dominated cells
+    stats = read_scan(csf.stats_filename(filtered))
+    assert any(kept < members / 2 for _, _, kept, members in stats)
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+import ClimSIPS.function as csf
+
+
+def test_xarray_solver_rejects_k_above_2(data):
+    cost = csf.get_cost_matrix(data.delta_q, data.delta_i, data.change, 0.3, 0.3, 2.2)
+    with pytest.raises(ValueError):
+        csf.xarray_combination_search(cost, list(cost.member.data), 3, 3, True, time.time())
+
+
+EXACT_SOLVERS = ['numpy', 'branch_and_bound', 'revolving_door', 'numba', 'milp']
+
+
+@pytest.mark.parametrize('solver', EXACT_SOLVERS)
+@pytest.mark.parametrize('min2', [False, True])
+@pytest.mark.parametrize('alpha, beta', [(0., 0.), (0.3, 0.3), (0.2, 0.7), (1., 0.)])
+def test_exact_solvers_match_xarray(data, solver, min2, alpha, beta):
+    args = (data.delta_q, data.delta_i, data.change, 4, alpha, beta, 2.2)
+    expected_val, expected_members = csf.get_best_m_models(*args, min2=min2, solver='xarray')
+    val, members = csf.get_best_m_models(*args, min2=min2, solver=solver)
+    assert list(members) == list(expected_members)
+    assert val == pytest.approx(float(expected_val), rel=1e-9)
+
+
+def test_unknown_solver(data):
+    with pytest.raises(ValueError, match='numpy'):
+        csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 3, 0.3, 0.3, 2.2, solver='fastest')
+
+
+@pytest.mark.parametrize('solver, shard_workers', [(solver, 1) for solver in EXACT_SOLVERS] + [('numpy', 3)])
+def test_top_k(data, solver, shard_workers):
+    args = (data.delta_q, data.delta_i, data.change, 4, 5, 0.3, 0.3, 2.2)
+    expected_vals, expected_members = csf.get_best_k_models(*args)
+    vals, members = csf.get_best_k_models(*args, solver=solver, shard_workers=shard_workers)
+    assert members.tolist() == expected_members.tolist()
+    assert vals == pytest.approx(expected_vals, rel=1e-9)
+    # the second best of top_k is the min2 subset
+    assert list(members[1]) == list(csf.get_best_m_models(*args[:4], *args[5:], min2=True)[1])
+
+
+def test_sharding_requires_numpy(data):
+    with pytest.raises(ValueError):
+        csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 3, 0.3, 0.3, 2.2, solver='branch_and_bound', shard_workers=2)
+
+
+def test_branch_and_bound_stats(data):
+    stats = {}
+    csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 4, 0.3, 0.3, 2.2, solver='branch_and_bound', stats=stats)
+    assert set(stats) == {'nodes', 'pruned', 'leaves'}
+    assert 0 < stats['leaves'] <= csf.n_combinations(int((data.delta_q < 2.2).sum()), 4)
+
+
+# with a single member and only performance or only independence every subset costs 0
+@pytest.mark.parametrize('solver', EXACT_SOLVERS)
+@pytest.mark.parametrize('alpha, beta', [(1., 0.), (0., 1.)])
+def test_tied_optima_follow_combination_order(data, solver, alpha, beta):
+    args = (data.delta_q, data.delta_i, data.change, 1, 3, alpha, beta, 2.2)
+    expected_vals, expected_members = csf.get_best_k_models(*args, solver='numpy')
+    vals, members = csf.get_best_k_models(*args, solver=solver)
+    assert members.tolist() == expected_members.tolist()
+    assert vals == pytest.approx(expected_vals, abs=1e-12)
+    for min2 in [False, True]:
+        expected = csf.get_best_m_models(*args[:4], *args[5:], min2=min2, solver='xarray')[1]
+        assert list(csf.get_best_m_models(*args[:4], *args[5:], min2=min2, solver=solver)[1]) == list(expected)
+
+
+@pytest.mark.parametrize('solver', csf.SOLVERS)
+def test_search_report(data, solver, capsys):
+    csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 4, 0.3, 0.3, 2.2, silent=False, solver=solver)
+    out = capsys.readouterr().out
+    total = csf.n_combinations(int((data.delta_q < 2.2).sum()), 4)
+    # only the solvers scoring every combination report all of them
+    assert (f'all {total} combinations tested' in out) == (solver in csf.EXHAUSTIVE_SOLVERS)
+    if solver not in csf.EXHAUSTIVE_SOLVERS:
+        assert f'of {total} combinations scored ({solver})' in out
+
+
+def test_heuristic_stats(data):
+    stats = {}
+    csf.get_best_m_models(data.delta_q, data.delta_i, data.change, 4, 0.3, 0.3, 2.2, solver='heuristic', stats=stats)
+    assert set(stats) == {'visited'}
+    assert 0 < stats['visited'] <= csf.n_combinations(int((data.delta_q < 2.2).sum()), 4)
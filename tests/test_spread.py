@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+import ClimSIPS.function as csf
+
+
+# single-variable pairwise loop, as get_squared_diff was computed before
+def reference_squared_diff(ds):
+    mod_coords = ds.member.values
+    res = xr.DataArray(np.empty((len(mod_coords), len(mod_coords))), dims=('member', 'member_model'),
+                       coords=dict(member=mod_coords, member_model=mod_coords))
+    for mod1 in ds:
+        for mod2 in ds:
+            res.loc[dict(member=mod1.member, member_model=mod2.member)] = (mod1 - mod2) ** 2
+    return res.where(res != 0)
+
+
+def targets(n=8, seed=0):
+    rng = np.random.default_rng(seed)
+    members = [f'M{i}' for i in range(n)]
+    tas, pr = rng.normal(size=n), rng.normal(size=n)
+    # M1 and M2 share their temperature change, M3 and M4 their precipitation change
+    tas[2] = tas[1]
+    pr[4] = pr[3]
+    tas = xr.DataArray(tas, dims='member', coords=dict(member=members))
+    pr = xr.DataArray(pr, dims='member', coords=dict(member=members))
+    return tas, pr
+
+
+@pytest.mark.parametrize('shuffled', [False, True])
+def test_squared_diff_matches_sum_of_single_variables(shuffled):
+    tas, pr = targets()
+    if shuffled:
+        pr = pr.isel(member=np.random.default_rng(1).permutation(len(pr)))
+    # the spread metric summed the matrices of each variable
+    expected = reference_squared_diff(tas) + reference_squared_diff(pr)
+    result = csf.get_squared_diff(tas, pr)
+    expected = expected.sel(member=result.member, member_model=result.member_model)
+    assert (np.isnan(expected) == np.isnan(result)).all()
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_zero_difference_in_any_variable_is_nan():
+    result = csf.get_squared_diff(*targets())
+    nan = np.isnan(result.values)
+    expected = np.eye(len(result), dtype=bool)
+    expected[[1, 2, 3, 4], [2, 1, 4, 3]] = True
+    assert (nan == expected).all()
+
+
+def test_single_variable_matches_loop():
+    tas, _ = targets()
+    xr.testing.assert_allclose(csf.get_squared_diff(tas), reference_squared_diff(tas))